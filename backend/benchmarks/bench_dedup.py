@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection benchmark
+
+1. Fingerprinting throughput: MinHash signatures per second for synthetic
+   story-length texts (--sample of them).
+2. LSH index at scale: --n stories (default 1M) are loaded into an LSHIndex.
+   Unrelated stories get random signatures, which is what MinHash produces
+   for texts that share no shingles, so the index can be filled without
+   generating a million texts. The fingerprinted sample is mixed in.
+   Reported: bulk load time, incremental insert latency, and query latency
+   for near-duplicate queries (lightly edited copies of sample stories,
+   which must be found) and for fresh, unrelated stories.
+
+Run from the backend directory:
+
+    poetry run python benchmarks/bench_dedup.py --n 1000000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from threadist_backend.services.dedup import NUM_PERM, LSHIndex, minhash_signature
+
+VOCABULARY = [f"word{i}" for i in range(20000)]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def edit(text: str, rng: random.Random, changes: int) -> str:
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words)
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1e6
+    return f"p50 {np.percentile(values, 50):7.1f} us  p99 {np.percentile(values, 99):7.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=1000000, help="stories in the LSH index")
+    parser.add_argument("--sample", type=int, default=5000, help="texts to fingerprint")
+    parser.add_argument("--words", type=int, default=400, help="words per story")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [make_text(rng, args.words) for _ in range(args.sample)]
+
+    started = time.perf_counter()
+    signatures = np.stack([minhash_signature(text) for text in texts])
+    elapsed = time.perf_counter() - started
+    print(f"fingerprinting: {args.sample / elapsed:8.0f} stories/s ({args.words} words each)")
+
+    index = LSHIndex()
+    random_count = max(0, args.n - args.sample)
+    random_signatures = np.random.default_rng(0).integers(0, 2 ** 32, size=(random_count, NUM_PERM), dtype=np.uint32)
+    started = time.perf_counter()
+    index.add_many([f"r{i}" for i in range(random_count)], random_signatures)
+    index.add_many([f"s{i}" for i in range(args.sample)], signatures)
+    print(f"bulk load:      {len(index):8d} stories in {time.perf_counter() - started:.2f} s")
+
+    insert_times = []
+    for i in range(args.queries):
+        signature = minhash_signature(make_text(rng, args.words))
+        started = time.perf_counter()
+        index.add(f"n{i}", signature)
+        insert_times.append(time.perf_counter() - started)
+    print(f"insert:         {percentiles(insert_times)}")
+
+    duplicate_times, found = [], 0
+    for i in range(args.queries):
+        target = rng.randrange(args.sample)
+        signature = minhash_signature(edit(texts[target], rng, args.words // 100))
+        started = time.perf_counter()
+        matches = index.query(signature, args.threshold)
+        duplicate_times.append(time.perf_counter() - started)
+        found += any(key == f"s{target}" for key, _ in matches)
+    print(f"query (dup):    {percentiles(duplicate_times)}  recall {found / args.queries:.3f}")
+
+    fresh_times, false_positives = [], 0
+    for _ in range(args.queries):
+        signature = minhash_signature(make_text(rng, args.words))
+        started = time.perf_counter()
+        false_positives += bool(index.query(signature, args.threshold))
+        fresh_times.append(time.perf_counter() - started)
+    print(f"query (fresh):  {percentiles(fresh_times)}  false positives {false_positives}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Reddit listing parser microbenchmark
+
+Builds a synthetic listing response whose children carry Reddit's usual
+payload of unused fields (previews, awards, flair, media) and reports posts
+parsed per second for:
+
+  legacy     response.json() then a validated RedditPost per self post
+  json       parse_listing_bytes on the decode-whole-document path (orjson if installed)
+  streaming  parse_listing_bytes on the ijson incremental path (if installed)
+
+Run from the backend directory:
+
+    poetry run python benchmarks/bench_listing_parser.py --children 100 --pages 200
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+
+from threadist_backend.models import RedditPost
+from threadist_backend.services import reddit_parser
+from threadist_backend.services.story_classifier import StoryClassifier
+
+WORDS = "the night I heard it happened again story tale quiet house door stairs".split()
+
+
+def make_child(i: int, rng: random.Random) -> dict:
+    is_self = rng.random() < 0.7
+    selftext = " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 600))) if is_self else ""
+    return {
+        "kind": "t3",
+        "data": {
+            "id": f"p{i}",
+            "title": f"Post {i}",
+            "selftext": selftext,
+            "selftext_html": f"<div>{selftext}</div>" if selftext else None,
+            "author": f"user{i % 97}",
+            "subreddit": "nosleep",
+            "score": rng.randint(0, 40000),
+            "num_comments": rng.randint(0, 3000),
+            "created_utc": 1700000000.0 + i,
+            "url": f"https://www.reddit.com/r/nosleep/comments/p{i}/",
+            "is_self": is_self,
+            "preview": {"images": [{"source": {"url": "https://i.redd.it/x.jpg", "width": 640, "height": 480},
+                                    "resolutions": [{"url": "https://i.redd.it/x.jpg", "width": w, "height": w}
+                                                    for w in (108, 216, 320)]}]},
+            "all_awardings": [{"id": f"award_{a}", "name": "Helpful", "coin_price": 150} for a in range(3)],
+            "link_flair_richtext": [{"e": "text", "t": "Series"}],
+            "media": None,
+            "secure_media_embed": {},
+            "upvote_ratio": 0.97,
+            "over_18": False,
+            "permalink": f"/r/nosleep/comments/p{i}/",
+            **{f"flag_{f}": False for f in range(40)},
+        },
+    }
+
+
+def make_listing(children: int, rng: random.Random) -> bytes:
+    return json.dumps({
+        "kind": "Listing",
+        "data": {"after": "t3_next", "before": None, "dist": children,
+                 "children": [make_child(i, rng) for i in range(children)]},
+    }).encode()
+
+
+def legacy_parse(content: bytes, classifier: StoryClassifier):
+    data = json.loads(content)
+    posts = []
+    for child in data["data"]["children"]:
+        post_data = child["data"]
+        if post_data.get("is_self", False):
+            post = RedditPost(
+                id=post_data["id"],
+                title=post_data["title"],
+                content=post_data.get("selftext", ""),
+                author=post_data["author"],
+                subreddit=post_data["subreddit"],
+                score=post_data["score"],
+                num_comments=post_data["num_comments"],
+                created_utc=post_data["created_utc"],
+                url=post_data["url"],
+                is_self=post_data["is_self"],
+                selftext=post_data.get("selftext"),
+            )
+            if classifier.classify_post(post):
+                posts.append(post)
+    return posts, data["data"].get("after")
+
+
+def timed(fn, pages, repeat):
+    best = float("inf")
+    # Like timeit, keep collector pauses out of the numbers
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for page in pages:
+                result = fn(page)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--children", type=int, default=100, help="children per listing page")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [make_listing(args.children, rng) for _ in range(args.pages)]
+    classifier = StoryClassifier()
+    total = args.children * args.pages
+    page_kb = sum(len(page) for page in pages) / len(pages) / 1024
+
+    variants = [
+        ("legacy", lambda page: legacy_parse(page, classifier)),
+        ("json", lambda page: reddit_parser.parse_listing_bytes(page, classifier, stream=False)),
+    ]
+    if reddit_parser.ijson is not None:
+        variants.append(("streaming", lambda page: reddit_parser.parse_listing_bytes(page, classifier, stream=True)))
+    else:
+        print("ijson not installed; skipping the streaming parser")
+
+    print(f"{args.pages} pages x {args.children} children, {page_kb:.0f} KB per page")
+    baseline = None
+    expected = None
+    for name, fn in variants:
+        elapsed, (posts, after) = timed(fn, pages, args.repeat)
+        ids = [post.id for post in posts]
+        expected = expected or (ids, after)
+        assert (ids, after) == expected, f"{name} disagrees with legacy"
+        baseline = baseline or elapsed
+        print(f"{name:>10}: {total / elapsed:10.0f} posts/s  {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
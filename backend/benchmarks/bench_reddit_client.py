@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Reddit client connection benchmark
+
+Measures per-call latency of RedditService against a local stub server,
+comparing a fresh HTTP client per call (the old behaviour) with the shared
+pooled client. Calls go straight to fetch_subreddit_stories with a
+permissive rate limiter, so neither the listing cache nor request pacing
+is measured. Run from the backend directory:
+
+    poetry run python benchmarks/bench_reddit_client.py --calls 500
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from threadist_backend.config import Config
+from threadist_backend.services.reddit_scheduler import RedditRateLimiter
+from threadist_backend.services.reddit_service import RedditService
+
+LISTING = json.dumps({
+    "data": {
+        "after": None,
+        "children": [
+            {
+                "data": {
+                    "id": f"post{i}",
+                    "title": f"Story {i}",
+                    "selftext": "This is the story of what happened to me. " * 10,
+                    "author": "someone",
+                    "subreddit": "nosleep",
+                    "score": 100 + i,
+                    "num_comments": 10,
+                    "created_utc": time.time(),
+                    "url": f"https://reddit.com/r/nosleep/{i}",
+                    "is_self": True,
+                }
+            }
+            for i in range(25)
+        ],
+    }
+}).encode()
+
+TOKEN = json.dumps({"access_token": "stub-token", "expires_in": 3600}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _send(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._send(TOKEN)
+
+    def do_GET(self):
+        self._send(LISTING)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(service: RedditService, calls: int, pooled: bool):
+    latencies = []
+    await service.start()
+    for _ in range(calls):
+        started = time.perf_counter()
+        await service.fetch_subreddit_stories("nosleep", limit=25)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not pooled:
+            # Drop the pool so the next call pays a fresh connection, like
+            # the previous one-AsyncClient-per-call implementation did
+            await service.close()
+    await service.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        Config.REDDIT_HTTP2 = False
+
+    for label, pooled in (("per-call client", False), ("pooled client", True)):
+        # Never pace the stub: this compares connection handling only
+        limiter = RedditRateLimiter(requests_per_window=10 ** 9, burst=10 ** 9)
+        service = RedditService(rate_limiter=limiter)
+        service.api_base_url = base_url
+        service.token_manager.token_url = f"{base_url}/api/v1/access_token"
+        latencies = asyncio.run(run(service, args.calls, pooled))
+        print(
+            f"{label:>16}: p50={statistics.median(latencies):.2f}ms "
+            f"p99={percentile(latencies, 99):.2f}ms calls={len(latencies)}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Recommendation scoring benchmark
+
+Ranks N synthetic candidates with the per-story Python loop the service used
+to run (score every post, then sort the whole list) and with the vectorized
+batch scorer (one NumPy pass plus argpartition). Columnar arrays are built
+once up front, as the story store would hold them. Run from the backend
+directory:
+
+    poetry run python benchmarks/bench_scoring.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from threadist_backend.models import RedditPost, UserInterest
+from threadist_backend.services.scoring import CandidateBatch, score_batch, top_k
+
+
+def make_posts(n: int, subreddits: int, rng: np.random.Generator):
+    now = time.time()
+    scores = rng.integers(0, 50000, n)
+    comments = rng.integers(0, 2000, n)
+    ages = rng.uniform(0, 7 * 24 * 3600, n)
+    subs = rng.integers(0, subreddits, n)
+    return [
+        RedditPost.model_construct(
+            id=str(i),
+            title="",
+            content="",
+            author="",
+            subreddit=f"sub{subs[i]}",
+            score=int(scores[i]),
+            num_comments=int(comments[i]),
+            created_utc=float(now - ages[i]),
+            url="",
+            is_self=True,
+        )
+        for i in range(n)
+    ]
+
+
+def loop_rank(posts, interests, k):
+    """The previous per-story implementation"""
+    def story_score(story):
+        base_score = story.score
+        interest_boost = 0
+        for interest in interests:
+            if interest.weight > 1:
+                interest_boost += interest.weight * 10
+        current_time = time.time()
+        age_in_hours = (current_time - story.created_utc) / 3600
+        recency_boost = max(0, 100 - age_in_hours)
+        engagement_boost = min(story.num_comments * 2, 100)
+        return base_score + interest_boost + recency_boost + engagement_boost
+
+    scored = [(story_score(post), post) for post in posts]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:k]
+
+
+def batch_rank(batch, boosts, k):
+    scores = score_batch(batch, boosts)
+    return top_k(scores, k)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--subreddits", type=int, default=50)
+    parser.add_argument("--interests", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    interests = [
+        UserInterest(interest_id=str(i), csid=str(i), user_id="u", weight=int(rng.integers(1, 4)))
+        for i in range(args.interests)
+    ]
+    boost = float(sum(i.weight * 10 for i in interests if i.weight > 1))
+
+    print(f"{'candidates':>12} {'loop ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for n in args.sizes:
+        posts = make_posts(n, args.subreddits, rng)
+        batch = CandidateBatch.from_posts(posts)
+        boosts = np.full(len(batch.subreddits), boost)
+
+        loop_time = timed(lambda: loop_rank(posts, interests, args.k), args.repeat)
+        batch_time = timed(lambda: batch_rank(batch, boosts, args.k), args.repeat)
+        print(
+            f"{n:>12} {loop_time * 1000:>10.1f} {batch_time * 1000:>10.1f} "
+            f"{loop_time / batch_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+"More like this" benchmark
+
+Embeds --n synthetic stories with HashingEmbedder and loads them into
+StoryEmbeddings, then measures similar-story query latency and, for the IVF
+index, recall of the top 10 against an exact search. Stories are drawn from
+a handful of topics so neighbours exist. Run from the backend directory:
+
+    poetry run python benchmarks/bench_similarity.py --n 50000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from threadist_backend.models import RedditPost
+from threadist_backend.services.embeddings import StoryEmbeddings
+from threadist_backend.services.vector_index import VectorIndex
+
+TOPICS = 40
+TOPIC_WORDS = 200
+COMMON_WORDS = [f"common{i}" for i in range(3000)]
+
+
+def make_posts(n: int, words: int, rng: random.Random):
+    topics = [[f"t{topic}w{i}" for i in range(TOPIC_WORDS)] for topic in range(TOPICS)]
+    posts = []
+    for i in range(n):
+        topic = topics[rng.randrange(TOPICS)]
+        text = " ".join(rng.choice(topic) if rng.random() < 0.3 else rng.choice(COMMON_WORDS) for _ in range(words))
+        posts.append(RedditPost.model_construct(
+            id=f"p{i}", title=" ".join(rng.choice(topic) for _ in range(6)), content=text, author="a",
+            subreddit=f"sub{i % 20}", score=0, num_comments=0, created_utc=0.0, url="", is_self=True,
+            selftext=text, is_story=True,
+        ))
+    return posts
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1000
+    return f"p50 {np.percentile(values, 50):6.2f} ms  p99 {np.percentile(values, 99):6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--words", type=int, default=250)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    posts = make_posts(args.n, args.words, rng)
+    embeddings = StoryEmbeddings()
+
+    started = time.perf_counter()
+    for start in range(0, len(posts), 1000):
+        embeddings.add(posts[start:start + 1000])
+    elapsed = time.perf_counter() - started
+    index = embeddings.index
+    mode = "IVF" if index.is_trained else "exact"
+    print(f"ingest: {args.n / elapsed:8.0f} stories/s, {args.n} stories, {mode} index")
+
+    exact = VectorIndex(index.dim, brute_force_max=len(posts) + 1)
+    exact.add_many([post.id for post in posts], np.stack([index.vector(post.id) for post in posts]))
+
+    latencies, recall = [], []
+    for _ in range(args.queries):
+        post = posts[rng.randrange(len(posts))]
+        started = time.perf_counter()
+        found = embeddings.similar(post, 10)
+        latencies.append(time.perf_counter() - started)
+        if index.is_trained:
+            query = embeddings._weighted_query(index.vector(post.id))
+            truth = {key for key, _ in exact.search(query, 10, exclude={post.id})}
+            recall.append(len(truth & {key for key, _ in found}) / max(1, len(truth)))
+    line = f"query:  {percentiles(latencies)}"
+    if recall:
+        line += f"  recall@10 {np.mean(recall):.3f}"
+    print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Story classifier benchmark
+
+Parses a synthetic listing corpus the way RedditService does. The old path
+built a RedditPost for every self post, then read the is_story property. The
+new path classifies the raw fields with StoryClassifier first and builds
+models only for stories. Raw classification throughput is also reported for
+the legacy heuristic, a single compiled re alternation and StoryClassifier.
+The corpus mixes short posts, long posts with a keyword and long posts with
+none. Run from the backend directory:
+
+    poetry run python benchmarks/bench_story_classifier.py --posts 20000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from threadist_backend.models import RedditPost
+from threadist_backend.services.story_classifier import DEFAULT_STORY_KEYWORDS, StoryClassifier
+
+FILLER = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua ut enim ad minim "
+).split()
+
+
+def make_corpus(n: int, rng: random.Random):
+    children = []
+    for i in range(n):
+        kind = rng.random()
+        words = rng.randint(5, 30) if kind < 0.4 else rng.randint(200, 1500)
+        text = [rng.choice(FILLER) for _ in range(words)]
+        if kind >= 0.4 and rng.random() < 0.6:
+            keyword = rng.choice(DEFAULT_STORY_KEYWORDS)
+            text.insert(rng.randint(0, len(text)), keyword.capitalize() if rng.random() < 0.5 else keyword)
+        children.append({
+            "id": str(i),
+            "title": "title",
+            "selftext": " ".join(text),
+            "author": "author",
+            "subreddit": "nosleep",
+            "score": rng.randint(0, 5000),
+            "num_comments": rng.randint(0, 500),
+            "created_utc": 1700000000.0,
+            "url": "https://reddit.com",
+            "is_self": True,
+        })
+    return children
+
+
+def legacy_is_story(is_self, selftext):
+    """The previous RedditPost.is_story property"""
+    if not is_self or not selftext:
+        return False
+    text = selftext.lower()
+    return len(selftext) > 200 and any(keyword in text for keyword in DEFAULT_STORY_KEYWORDS)
+
+
+def build(post_data, is_story=False):
+    return RedditPost(
+        id=post_data["id"],
+        title=post_data["title"],
+        content=post_data.get("selftext", ""),
+        author=post_data["author"],
+        subreddit=post_data["subreddit"],
+        score=post_data["score"],
+        num_comments=post_data["num_comments"],
+        created_utc=post_data["created_utc"],
+        url=post_data["url"],
+        is_self=post_data["is_self"],
+        selftext=post_data.get("selftext"),
+        is_story=is_story,
+    )
+
+
+def legacy_parse(children):
+    posts = []
+    for post_data in children:
+        if post_data.get("is_self", False):
+            post = build(post_data)
+            if legacy_is_story(post.is_self, post.selftext):
+                posts.append(post)
+    return posts
+
+
+def classifier_parse(children, classifier):
+    posts = []
+    for post_data in children:
+        is_story = classifier.classify(
+            post_data.get("is_self", False), post_data.get("selftext"), post_data["subreddit"]
+        )
+        if is_story:
+            posts.append(build(post_data, is_story))
+    return posts
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def report(name, elapsed, posts, chars, baseline):
+    print(
+        f"{name:>19}: {elapsed * 1000:8.1f} ms {posts / elapsed:10.0f} posts/s "
+        f"{chars / elapsed / 1e6:7.1f} MB/s {baseline / elapsed:6.2f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    children = make_corpus(args.posts, random.Random(0))
+    texts = [post_data["selftext"] for post_data in children]
+    chars = sum(len(text) for text in texts)
+    classifier = StoryClassifier()
+    alternation = re.compile("|".join(map(re.escape, DEFAULT_STORY_KEYWORDS)), re.IGNORECASE)
+
+    legacy_time, legacy = timed(lambda: [legacy_is_story(True, text) for text in texts], args.repeat)
+    regex_time, regex = timed(
+        lambda: [len(text) > 200 and alternation.search(text) is not None for text in texts], args.repeat
+    )
+    fast_time, fast = timed(lambda: [classifier.classify(True, text) for text in texts], args.repeat)
+    assert legacy == regex == fast, "classifiers disagree"
+
+    print(f"{args.posts} posts, {chars / 1e6:.1f}M chars, {sum(fast)} stories")
+    print("classification")
+    report("legacy", legacy_time, args.posts, chars, legacy_time)
+    report("re alternation", regex_time, args.posts, chars, legacy_time)
+    report("StoryClassifier", fast_time, args.posts, chars, legacy_time)
+
+    legacy_parse_time, _ = timed(lambda: legacy_parse(children), args.repeat)
+    parse_time, _ = timed(lambda: classifier_parse(children, classifier), args.repeat)
+    print("listing parse")
+    report("model then is_story", legacy_parse_time, args.posts, chars, legacy_parse_time)
+    report("classify then model", parse_time, args.posts, chars, legacy_parse_time)
+
+
+if __name__ == "__main__":
+    main()
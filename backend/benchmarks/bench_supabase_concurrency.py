@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Supabase concurrency benchmark
+
+Measures get_user_profile throughput (the work behind /api/user/{id}/profile)
+as the number of in-flight requests grows. A fake supabase client sleeps to
+simulate a blocking network round trip, so the old inline calls serialize on
+the event loop while the executor-backed service overlaps them. Run from the
+backend directory:
+
+    poetry run python benchmarks/bench_supabase_concurrency.py --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from threadist_backend.config import Config
+from threadist_backend.models import UserInterest, UserProfile
+from threadist_backend.services.supabase_service import SupabaseService
+
+
+class FakeQuery:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __getattr__(self, name):
+        # select/eq/in_/... just keep building the same query
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        return SimpleNamespace(data=[
+            {"interest_id": "i1", "csid": "c1", "user_id": "u1", "weight": 2}
+        ])
+
+
+class FakeClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.auth = SimpleNamespace(admin=SimpleNamespace(get_user_by_id=self._get_user))
+
+    def _get_user(self, user_id):
+        time.sleep(self.latency)
+        return SimpleNamespace(user=SimpleNamespace(email=f"{user_id}@example.com"))
+
+    def table(self, name):
+        return FakeQuery(self.latency)
+
+
+async def blocking_profile(client: FakeClient, user_id: str) -> UserProfile:
+    """The previous implementation: blocking calls made inline on the loop"""
+    response = client.auth.admin.get_user_by_id(user_id)
+    rows = client.table('user_interests').select('*').eq('user_id', user_id).execute().data
+    return UserProfile(
+        user_id=user_id,
+        email=response.user.email,
+        interests=[UserInterest(**row) for row in rows]
+    )
+
+
+async def measure(call, in_flight: int, total: int) -> float:
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def one(i):
+        async with semaphore:
+            await call(f"user{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def run(latency: float, total: int):
+    client = FakeClient(latency)
+    service = SupabaseService(client=client)
+    try:
+        for in_flight in (1, 4, 16, 64):
+            before = await measure(lambda uid: blocking_profile(client, uid), in_flight, total)
+            after = await measure(service.get_user_profile, in_flight, total)
+            print(
+                f"in-flight={in_flight:>3}: blocking={before:8.1f} req/s  "
+                f"executor={after:8.1f} req/s"
+            )
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"executor workers={Config.SUPABASE_EXECUTOR_WORKERS}")
+    asyncio.run(run(args.latency_ms / 1000, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+HTTP helpers for serving stored audio with byte ranges and conditional GETs.
+"""
+
+import os
+import re
+from typing import AsyncIterator, Optional, Tuple
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+# Generated audio never changes once written, so clients may keep it for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+READ_CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range into inclusive offsets.
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges) and raises RangeNotSatisfiable when it cannot be served.
+    """
+    match = _RANGE.match(header)
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if size == 0:
+        # An empty file has no bytes to select
+        raise RangeNotSatisfiable()
+
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size - 1
+
+    first = int(start)
+    last = int(end) if end else size - 1
+    if first >= size or last < first:
+        raise RangeNotSatisfiable()
+    return first, min(last, size - 1)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def file_etag(file_path: str, stat: os.stat_result) -> str:
+    """
+    Strong ETag from the file's name, which is already a content address,
+    plus its size. The mtime is left out: the audio store touches files it
+    reuses, and that must not make clients download an unchanged clip again.
+    """
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return f'"{name}-{stat.st_size:x}"'
+
+
+async def _read_range(file_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    remaining = end - start + 1
+    async with aiofiles.open(file_path, "rb") as f:
+        await f.seek(start)
+        while remaining > 0:
+            block = await f.read(min(READ_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+async def audio_file_response(
+    request: Request,
+    file_path: str,
+    filename: str,
+    media_type: str = "audio/mpeg"
+) -> Response:
+    """Serve an audio file honoring Range, If-Range and If-None-Match"""
+    stat = os.stat(file_path)
+    size = stat.st_size
+    etag = file_etag(file_path, stat)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                _read_range(file_path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{size}",
+                    "Content-Length": str(end - start + 1),
+                }
+            )
+
+    return FileResponse(
+        file_path,
+        media_type=media_type,
+        filename=filename,
+        headers=headers
+    )
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,10 +13,121 @@ class Config:
     # ElevenLabs Configuration
     ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
     
+    # Generated Audio Store Configuration (served by /api/tts/audio)
+    AUDIO_STORE_DIR = os.getenv("AUDIO_STORE_DIR", os.path.join(tempfile.gettempdir(), "threadist-audio"))
+    AUDIO_STORE_MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+    AUDIO_STORE_MAX_AGE_SECONDS = float(os.getenv("AUDIO_STORE_MAX_AGE_SECONDS", str(24 * 3600)))
+    AUDIO_STORE_JANITOR_INTERVAL = float(os.getenv("AUDIO_STORE_JANITOR_INTERVAL", "600"))
+    
+    # Long-form Narration Configuration
+    TTS_CHUNK_MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "2500"))
+    TTS_LONGFORM_WORKERS = int(os.getenv("TTS_LONGFORM_WORKERS", "3"))
+    TTS_LONGFORM_MAX_CHARS = int(os.getenv("TTS_LONGFORM_MAX_CHARS", "100000"))
+    
+    # TTS Audio Cache Configuration (sizes in bytes, TTL in seconds)
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "threadist-tts-cache"))
+    TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+    TTS_CACHE_DISK_BYTES = int(os.getenv("TTS_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+    TTS_CACHE_TTL_SECONDS = float(os.getenv("TTS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
     # Reddit API Configuration
     REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
     REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
     REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "Threadist/1.0")
+    REDDIT_API_BASE_URL = os.getenv("REDDIT_API_BASE_URL", "https://oauth.reddit.com")
+    REDDIT_TOKEN_URL = os.getenv("REDDIT_TOKEN_URL", "https://www.reddit.com/api/v1/access_token")
+    REDDIT_TOKEN_REFRESH_MARGIN = float(os.getenv("REDDIT_TOKEN_REFRESH_MARGIN", "300"))
+    
+    # Reddit Rate Limiting Configuration (X-Ratelimit headers override these at runtime)
+    REDDIT_RATE_LIMIT_REQUESTS = int(os.getenv("REDDIT_RATE_LIMIT_REQUESTS", "100"))
+    REDDIT_RATE_LIMIT_WINDOW = float(os.getenv("REDDIT_RATE_LIMIT_WINDOW", "60"))
+    REDDIT_RATE_LIMIT_BURST = int(os.getenv("REDDIT_RATE_LIMIT_BURST", "20"))
+    REDDIT_BACKGROUND_RESERVE = int(os.getenv("REDDIT_BACKGROUND_RESERVE", "20"))
+    REDDIT_MAX_RETRIES = int(os.getenv("REDDIT_MAX_RETRIES", "3"))
+    REDDIT_RETRY_BASE_DELAY = float(os.getenv("REDDIT_RETRY_BASE_DELAY", "0.5"))
+    REDDIT_RETRY_MAX_DELAY = float(os.getenv("REDDIT_RETRY_MAX_DELAY", "10"))
+    
+    # Reddit HTTP Client Configuration (shared connection pool)
+    REDDIT_HTTP2 = os.getenv("REDDIT_HTTP2", "True").lower() == "true"
+    REDDIT_MAX_CONNECTIONS = int(os.getenv("REDDIT_MAX_CONNECTIONS", "20"))
+    REDDIT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("REDDIT_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    REDDIT_KEEPALIVE_EXPIRY = float(os.getenv("REDDIT_KEEPALIVE_EXPIRY", "30"))
+    REDDIT_REQUEST_TIMEOUT = float(os.getenv("REDDIT_REQUEST_TIMEOUT", "10"))
+    # Listings at least this large are stream-parsed when ijson is installed
+    REDDIT_STREAM_PARSE_MIN_BYTES = int(os.getenv("REDDIT_STREAM_PARSE_MIN_BYTES", "1048576"))
+    
+    # Deep crawl: listing pages are walked with after cursors until enough stories are found
+    REDDIT_CRAWL_PAGE_SIZE = int(os.getenv("REDDIT_CRAWL_PAGE_SIZE", "100"))
+    REDDIT_CRAWL_MAX_PAGES = int(os.getenv("REDDIT_CRAWL_MAX_PAGES", "4"))
+    REDDIT_CRAWL_TIME_BUDGET = float(os.getenv("REDDIT_CRAWL_TIME_BUDGET", "2.0"))
+    
+    # Subreddit Listing Cache Configuration (TTLs in seconds; backend is "memory" or "redis")
+    LISTING_CACHE_BACKEND = os.getenv("LISTING_CACHE_BACKEND", "memory").lower()
+    LISTING_CACHE_TTL_HOT = float(os.getenv("LISTING_CACHE_TTL_HOT", "120"))
+    LISTING_CACHE_TTL_NEW = float(os.getenv("LISTING_CACHE_TTL_NEW", "60"))
+    LISTING_CACHE_TTL_RISING = float(os.getenv("LISTING_CACHE_TTL_RISING", "60"))
+    LISTING_CACHE_TTL_TOP = float(os.getenv("LISTING_CACHE_TTL_TOP", "900"))
+    LISTING_CACHE_STALE_SECONDS = float(os.getenv("LISTING_CACHE_STALE_SECONDS", "600"))
+    LISTING_CACHE_MAX_ENTRIES = int(os.getenv("LISTING_CACHE_MAX_ENTRIES", "1000"))
+    
+    # Supabase Executor Configuration (threads for the blocking client)
+    SUPABASE_EXECUTOR_WORKERS = int(os.getenv("SUPABASE_EXECUTOR_WORKERS", "16"))
+    
+    # Supabase Cache Configuration (seconds)
+    CATEGORY_SUBREDDIT_CACHE_TTL = float(os.getenv("CATEGORY_SUBREDDIT_CACHE_TTL", "600"))
+    
+    # Recommendation Fan-out Configuration
+    RECOMMENDATION_FANOUT_CONCURRENCY = int(os.getenv("RECOMMENDATION_FANOUT_CONCURRENCY", "5"))
+    SUBREDDIT_FETCH_TIMEOUT = float(os.getenv("SUBREDDIT_FETCH_TIMEOUT", "3"))
+    RECOMMENDATION_LATENCY_BUDGET = float(os.getenv("RECOMMENDATION_LATENCY_BUDGET", "5"))
+    
+    # Batch Subreddit Stories Configuration (one request for several listings)
+    SUBREDDIT_BATCH_MAX_ITEMS = int(os.getenv("SUBREDDIT_BATCH_MAX_ITEMS", "20"))
+    SUBREDDIT_BATCH_CONCURRENCY = int(os.getenv("SUBREDDIT_BATCH_CONCURRENCY", "8"))
+    SUBREDDIT_BATCH_LATENCY_BUDGET = float(os.getenv("SUBREDDIT_BATCH_LATENCY_BUDGET", "5"))
+    
+    # Story Ingestion Configuration (background crawl into the local story store)
+    INGESTION_ENABLED = os.getenv("INGESTION_ENABLED", "True").lower() == "true"
+    INGESTION_INTERVAL_SECONDS = float(os.getenv("INGESTION_INTERVAL_SECONDS", "300"))
+    INGESTION_SORTS = os.getenv("INGESTION_SORTS", "hot,new,top")
+    INGESTION_LISTING_LIMIT = int(os.getenv("INGESTION_LISTING_LIMIT", "100"))
+    INGESTION_CONCURRENCY = int(os.getenv("INGESTION_CONCURRENCY", "4"))
+    STORY_STORE_MAX_STORIES = int(os.getenv("STORY_STORE_MAX_STORIES", "50000"))
+    STORY_LISTING_MAX_AGE = float(os.getenv("STORY_LISTING_MAX_AGE", "900"))
+    
+    # Near-duplicate Detection Configuration (estimated Jaccard similarity of word 3-grams)
+    STORY_DUPLICATE_THRESHOLD = float(os.getenv("STORY_DUPLICATE_THRESHOLD", "0.8"))
+    TTS_DUPLICATE_THRESHOLD = float(os.getenv("TTS_DUPLICATE_THRESHOLD", "0.9"))
+    TTS_DUPLICATE_MAX_ENTRIES = int(os.getenv("TTS_DUPLICATE_MAX_ENTRIES", "20000"))
+    DUPLICATE_MIN_WORDS = int(os.getenv("DUPLICATE_MIN_WORDS", "50"))
+    
+    # Story Embedding Configuration (hashed text vectors; exact search up to ANN_BRUTE_FORCE_MAX stories)
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+    ANN_BRUTE_FORCE_MAX = int(os.getenv("ANN_BRUTE_FORCE_MAX", "20000"))
+    ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+    RECOMMENDATION_SIMILARITY_WEIGHT = float(os.getenv("RECOMMENDATION_SIMILARITY_WEIGHT", "100"))
+    
+    # Local Story Search Configuration (fewer local matches than this falls back to Reddit;
+    # a local match must contain at least LOCAL_SEARCH_MIN_TERM_MATCH of the query's terms)
+    LOCAL_SEARCH_MIN_RESULTS = int(os.getenv("LOCAL_SEARCH_MIN_RESULTS", "10"))
+    LOCAL_SEARCH_MIN_TERM_MATCH = float(os.getenv("LOCAL_SEARCH_MIN_TERM_MATCH", "0.75"))
+    
+    # Subreddit Metadata Cache Configuration (TTLs in seconds; fewer known name matches than
+    # SUBREDDIT_LOCAL_SEARCH_MIN_RESULTS falls back to Reddit's subreddit search)
+    SUBREDDIT_INFO_TTL = float(os.getenv("SUBREDDIT_INFO_TTL", "86400"))
+    SUBREDDIT_NOT_FOUND_TTL = float(os.getenv("SUBREDDIT_NOT_FOUND_TTL", "3600"))
+    SUBREDDIT_SEARCH_TTL = float(os.getenv("SUBREDDIT_SEARCH_TTL", "3600"))
+    SUBREDDIT_CACHE_MAX_ENTRIES = int(os.getenv("SUBREDDIT_CACHE_MAX_ENTRIES", "10000"))
+    SUBREDDIT_INDEX_MAX_NAMES = int(os.getenv("SUBREDDIT_INDEX_MAX_NAMES", "100000"))
+    SUBREDDIT_LOCAL_SEARCH_MIN_RESULTS = int(os.getenv("SUBREDDIT_LOCAL_SEARCH_MIN_RESULTS", "5"))
+    
+    # Per-user Recommendation Feed Configuration
+    USER_FEED_SIZE = int(os.getenv("USER_FEED_SIZE", "100"))
+    USER_FEED_TTL = float(os.getenv("USER_FEED_TTL", "600"))
+    USER_FEED_MAX_USERS = int(os.getenv("USER_FEED_MAX_USERS", "10000"))
+    
+    # Trending Feed Configuration (seconds between recomputations)
+    TRENDING_REFRESH_SECONDS = float(os.getenv("TRENDING_REFRESH_SECONDS", "300"))
     
     # Redis Configuration
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
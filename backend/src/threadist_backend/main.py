@@ -1,19 +1,28 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional
 import os
-import tempfile
+import time
 
+from .audio_response import audio_file_response, etag_matches
 from .config import Config
 from .models import (
     RedditPost, SubredditInfo, StoryRecommendation, 
-    AudioStreamResponse, AudioStreamRequest, SearchRequest, UserProfile
+    AudioStreamResponse, AudioStreamRequest, SearchRequest, UserProfile,
+    BatchSubredditStoriesRequest, SubredditStoriesResult
 )
 from .services.reddit_service import RedditService
 from .services.elevenlabs_service import ElevenLabsService
+from .services.narration_service import NarrationService
 from .services.supabase_service import SupabaseService
 from .services.recommendation_service import RecommendationService
+from .services.story_store import StoryStore
+from .services.ingestion_service import IngestionService
+from .services.search_service import StorySearchService
+from .services.subreddit_directory import SubredditDirectory
+from .services.trending_feed import TrendingFeed
+from .services.feed_cache import StaleCursorError
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -34,8 +43,14 @@ app.add_middleware(
 # Initialize services
 reddit_service = RedditService()
 elevenlabs_service = ElevenLabsService()
+narration_service = NarrationService(elevenlabs_service)
 supabase_service = SupabaseService()
-recommendation_service = RecommendationService()
+story_store = StoryStore()
+search_service = StorySearchService(reddit_service, story_store)
+subreddit_directory = SubredditDirectory(reddit_service)
+recommendation_service = RecommendationService(reddit_service, supabase_service, story_store)
+ingestion_service = IngestionService(reddit_service, supabase_service, story_store)
+trending_feed = TrendingFeed(recommendation_service)
 
 @app.on_event("startup")
 async def startup_event():
@@ -46,6 +61,22 @@ async def startup_event():
     except ValueError as e:
         print(f"❌ Configuration error: {e}")
         raise e
+    
+    await reddit_service.start()
+    narration_service.audio_store.start_janitor()
+    
+    if Config.INGESTION_ENABLED:
+        ingestion_service.start()
+    trending_feed.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work and release pooled connections on shutdown"""
+    await trending_feed.stop()
+    await ingestion_service.stop()
+    await reddit_service.close()
+    await narration_service.audio_store.stop_janitor()
+    supabase_service.close()
 
 @app.get("/")
 async def root():
@@ -59,9 +90,9 @@ async def search_stories(
     subreddit: Optional[str] = Query(None, description="Limit search to specific subreddit"),
     limit: int = Query(25, ge=1, le=100, description="Number of results to return")
 ):
-    """Search for stories on Reddit"""
+    """Search for stories, answered from crawled stories when enough match"""
     try:
-        stories = await reddit_service.search_stories(query, subreddit, limit)
+        stories = await search_service.search(query, subreddit, limit)
         return stories
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching stories: {str(e)}")
@@ -79,11 +110,21 @@ async def get_subreddit_stories(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting subreddit stories: {str(e)}")
 
+@app.post("/api/reddit/subreddits/stories", response_model=List[SubredditStoriesResult])
+async def get_subreddit_stories_batch(batch: BatchSubredditStoriesRequest):
+    """Get stories from several subreddits in one request, with an error per failed listing"""
+    if len(batch.requests) > Config.SUBREDDIT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {Config.SUBREDDIT_BATCH_MAX_ITEMS} subreddits per request"
+        )
+    return await reddit_service.get_subreddit_stories_batch(batch.requests)
+
 @app.get("/api/reddit/subreddit/{subreddit}/info", response_model=SubredditInfo)
 async def get_subreddit_info(subreddit: str):
     """Get information about a subreddit"""
     try:
-        info = await reddit_service.get_subreddit_info(subreddit)
+        info = await subreddit_directory.get_info(subreddit)
         if not info:
             raise HTTPException(status_code=404, detail="Subreddit not found")
         return info
@@ -99,7 +140,7 @@ async def search_subreddits(
 ):
     """Search for subreddits"""
     try:
-        subreddits = await reddit_service.search_subreddits(query, limit)
+        subreddits = await subreddit_directory.search(query, limit)
         return subreddits
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching subreddits: {str(e)}")
@@ -107,24 +148,58 @@ async def search_subreddits(
 # Recommendation Routes
 @app.get("/api/recommendations/stories", response_model=List[StoryRecommendation])
 async def get_recommended_stories(
+    response: Response,
     user_id: str = Query(..., description="User ID"),
-    limit: int = Query(10, ge=1, le=50)
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor to load more")
 ):
-    """Get personalized story recommendations"""
+    """Get personalized story recommendations; the next page's cursor is in X-Next-Cursor"""
     try:
-        recommendations = await recommendation_service.get_recommended_stories(user_id, limit)
+        recommendations, next_cursor = await recommendation_service.get_recommended_page(user_id, limit, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return recommendations
+    except StaleCursorError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting recommendations: {str(e)}")
 
+@app.get("/api/stories/{post_id}/similar", response_model=List[StoryRecommendation])
+async def get_similar_stories(
+    post_id: str,
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Get stories similar in content to a crawled story ("more like this")"""
+    try:
+        recommendations = recommendation_service.get_similar_stories(post_id, limit)
+        if recommendations is None:
+            raise HTTPException(status_code=404, detail="Story not found")
+        return recommendations
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting similar stories: {str(e)}")
+
 @app.get("/api/recommendations/trending", response_model=List[StoryRecommendation])
 async def get_trending_stories(
+    request: Request,
     limit: int = Query(10, ge=1, le=50)
 ):
-    """Get trending stories across popular subreddits"""
+    """Get trending stories across popular subreddits (served from the materialized feed)"""
     try:
-        recommendations = await recommendation_service.get_trending_stories(limit)
-        return recommendations
+        body, etag = await trending_feed.get(limit)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={int(Config.TRENDING_REFRESH_SECONDS)}"
+        }
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting trending stories: {str(e)}")
 
@@ -133,59 +208,90 @@ async def get_trending_stories(
 async def stream_audio(request: AudioStreamRequest):
     """Stream audio directly from text using ElevenLabs"""
     try:
-        if len(request.text) > 5000:  # Limit text length
-            raise HTTPException(status_code=400, detail="Text too long (max 5000 characters)")
+        if len(request.text) > Config.TTS_LONGFORM_MAX_CHARS:  # Limit text length
+            raise HTTPException(
+                status_code=400,
+                detail=f"Text too long (max {Config.TTS_LONGFORM_MAX_CHARS} characters)"
+            )
         
-        # Generate audio bytes
-        audio_bytes = await elevenlabs_service.text_to_speech_stream(
+        # Long stories are split and synthesized in pipelined chunks
+        audio_stream = narration_service.stream_long(
             request.text, 
-            request.voice_id
+            request.voice_id,
+            request.model_id,
+            request.output_format
         )
         
-        # Return streaming response
+        # Wait for the first chunk (served from cache or ElevenLabs) so
+        # upstream errors still surface as a 500
+        started = time.perf_counter()
+        try:
+            first_chunk = await audio_stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+        ttfb_ms = (time.perf_counter() - started) * 1000
+        
+        async def audio_chunks():
+            yield first_chunk
+            async for chunk in audio_stream:
+                yield chunk
+        
+        # Forward chunks to the client as they arrive from ElevenLabs
         return StreamingResponse(
-            iter([audio_bytes]),
+            audio_chunks(),
             media_type="audio/mpeg",
             headers={
                 "Content-Disposition": "attachment; filename=audio.mp3",
-                "Content-Length": str(len(audio_bytes))
+                "X-TTFB-Ms": f"{ttfb_ms:.1f}"
             }
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating audio stream: {str(e)}")
 
+@app.get("/api/tts/metrics")
+async def get_tts_metrics():
+    """Get TTS stream timings and audio cache hit/miss/eviction counters"""
+    return {
+        "stream": elevenlabs_service.metrics.to_dict(),
+        "cache": narration_service.audio_cache.get_stats()
+    }
+
 @app.post("/api/tts/generate", response_model=AudioStreamResponse)
 async def generate_audio(text: str = Query(..., description="Text to convert to speech")):
     """Generate audio from text using ElevenLabs (file-based, for backward compatibility)"""
     try:
-        if len(text) > 5000:  # Limit text length
-            raise HTTPException(status_code=400, detail="Text too long (max 5000 characters)")
+        if len(text) > Config.TTS_LONGFORM_MAX_CHARS:  # Limit text length
+            raise HTTPException(
+                status_code=400,
+                detail=f"Text too long (max {Config.TTS_LONGFORM_MAX_CHARS} characters)"
+            )
         
-        audio_path = await elevenlabs_service.text_to_speech_file(text)
+        filename = await narration_service.generate_file(text)
         
         return AudioStreamResponse(
-            audio_url=f"/api/tts/audio/{os.path.basename(audio_path)}",
+            audio_url=f"/api/tts/audio/{filename}",
             text_length=len(text)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
 
 @app.get("/api/tts/audio/{filename}")
-async def get_audio_file(filename: str):
-    """Serve generated audio files"""
+async def get_audio_file(filename: str, request: Request):
+    """Serve generated audio files with byte-range and conditional GET support"""
     try:
-        # In production, you'd want to store files in a proper file storage service
-        temp_dir = tempfile.gettempdir()
-        file_path = os.path.join(temp_dir, filename)
+        try:
+            file_path = narration_service.audio_store.path_for(filename)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Audio file not found")
         
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="Audio file not found")
         
-        return FileResponse(
-            file_path,
-            media_type="audio/mpeg",
-            filename=filename
-        )
+        return await audio_file_response(request, file_path, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -15,19 +15,8 @@ class RedditPost(BaseModel):
     url: str
     is_self: bool
     selftext: Optional[str] = None
-    
-    @property
-    def is_story(self) -> bool:
-        """Simple heuristic to determine if a post is a story"""
-        if not self.is_self or not self.selftext:
-            return False
-        
-        # Check if it's a story based on content length and keywords
-        text = self.selftext.lower()
-        story_keywords = ['story', 'tale', 'experience', 'happened', 'incident', 'event']
-        
-        # Must be at least 200 characters and contain story-related keywords
-        return len(self.selftext) > 200 and any(keyword in text for keyword in story_keywords)
+    # Set once by the story classifier when the post is parsed
+    is_story: bool = False
 
 class SubredditInfo(BaseModel):
     name: str
@@ -58,6 +47,22 @@ class SearchRequest(BaseModel):
     subreddit: Optional[str] = None
     limit: int = Field(default=25, ge=1, le=100)
 
+class SubredditStoriesRequest(BaseModel):
+    # Goes into the Reddit URL path, so only real subreddit names are accepted
+    subreddit: str = Field(pattern=r"^[A-Za-z0-9_]{2,21}$")
+    sort: str = Field(default="hot", pattern="^(hot|new|top|rising)$")
+    limit: int = Field(default=25, ge=1, le=100)
+
+class BatchSubredditStoriesRequest(BaseModel):
+    requests: List[SubredditStoriesRequest]
+
+class SubredditStoriesResult(BaseModel):
+    subreddit: str
+    sort: str
+    limit: int
+    stories: List[RedditPost] = []
+    error: Optional[str] = None
+
 class UserInterest(BaseModel):
     interest_id: str
     csid: str
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import aiofiles
+import aiofiles.os
+
+from ..config import Config
+
+
+def normalize_tts_text(text: str) -> str:
+    """Normalize text so trivially different inputs share one cache entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def audio_cache_key(
+    text: str,
+    voice_id: str,
+    model_id: str,
+    output_format: str,
+    voice_settings: Optional[Dict[str, Any]] = None
+) -> str:
+    """Content address for a synthesized clip"""
+    payload = json.dumps(
+        {
+            "text": normalize_tts_text(text),
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "output_format": output_format,
+            "voice_settings": voice_settings or {},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Two-tier cache of synthesized audio keyed by audio_cache_key.
+
+    Hot clips live in a bounded in-memory LRU; everything is also written to
+    an on-disk store capped by total size, evicted least-recently-used first
+    and expired after a TTL.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_max_bytes: Optional[int] = None,
+        disk_max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.directory = directory or Config.TTS_CACHE_DIR
+        self.memory_max_bytes = memory_max_bytes if memory_max_bytes is not None else Config.TTS_CACHE_MEMORY_BYTES
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else Config.TTS_CACHE_DISK_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.TTS_CACHE_TTL_SECONDS
+
+        # key -> (audio, created_at), ordered from least to most recently used
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (size, created_at), ordered from least to most recently used
+        self._disk: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_bytes = 0
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expirations": 0,
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_disk_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _load_disk_index(self):
+        """Rebuild the disk index from files left by a previous run"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".mp3"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_atime, name[:-4], stat.st_size, stat.st_mtime))
+        for _, key, size, created_at in sorted(entries):
+            self._disk[key] = (size, created_at)
+            self._disk_bytes += size
+
+    def _remember(self, key: str, audio: bytes, created_at: float):
+        if len(audio) > self.memory_max_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = (audio, created_at)
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["memory_evictions"] += 1
+
+    def _forget(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0])
+
+    def _drop_disk_entry(self, key: str):
+        # A concurrent put() may already have evicted the entry
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry[0]
+
+    async def _remove_from_disk(self, key: str):
+        self._drop_disk_entry(key)
+        try:
+            await aiofiles.os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or key in self._disk
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for key, or None on a miss"""
+        cached = self._memory.get(key)
+        if cached is not None:
+            audio, created_at = cached
+            if self._expired(created_at):
+                self._forget(key)
+            else:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return audio
+
+        entry = self._disk.get(key)
+        if entry is not None:
+            if self._expired(entry[1]):
+                await self._remove_from_disk(key)
+                self.stats["expirations"] += 1
+            else:
+                try:
+                    async with aiofiles.open(self._path(key), "rb") as f:
+                        audio = await f.read()
+                except FileNotFoundError:
+                    self._drop_disk_entry(key)
+                else:
+                    # The entry may have been evicted while the file was read
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self._remember(key, audio, entry[1])
+                    self.stats["disk_hits"] += 1
+                    return audio
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, audio: bytes):
+        """Store audio in both tiers, evicting old entries to stay within caps"""
+        if not audio:
+            return
+        created_at = time.time()
+        self._remember(key, audio, created_at)
+
+        if len(audio) > self.disk_max_bytes:
+            return
+        if key in self._disk:
+            self._disk.move_to_end(key)
+            return
+
+        # Write then rename so readers never see a partial clip
+        tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(audio)
+            await aiofiles.os.replace(tmp_path, self._path(key))
+        except Exception:
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        # A concurrent put() for the same key may have finished first
+        self._drop_disk_entry(key)
+        self._disk[key] = (len(audio), created_at)
+        self._disk_bytes += len(audio)
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            oldest = next(iter(self._disk))
+            await self._remove_from_disk(oldest)
+            self.stats["disk_evictions"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+        }
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import re
+import time
+import uuid
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+
+from ..config import Config
+
+# Only flat, generated names are ever served: no separators, no dot-files
+_FILENAME = re.compile(r"^[A-Za-z0-9_-]{1,128}\.mp3$")
+
+
+class AudioStore:
+    """
+    Directory of generated audio files served by /api/tts/audio.
+
+    Files are written atomically (write to a temp file, then rename) and a
+    background janitor deletes files older than max_age_seconds and then the
+    oldest files until the directory fits in max_bytes.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        janitor_interval: Optional[float] = None
+    ):
+        self.root = os.path.realpath(root or Config.AUDIO_STORE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else Config.AUDIO_STORE_MAX_BYTES
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else Config.AUDIO_STORE_MAX_AGE_SECONDS
+        self.janitor_interval = janitor_interval if janitor_interval is not None else Config.AUDIO_STORE_JANITOR_INTERVAL
+        self._janitor: Optional[asyncio.Task] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, filename: str) -> str:
+        """Resolve a client-supplied filename inside the store, rejecting anything else"""
+        if not _FILENAME.match(filename):
+            raise ValueError(f"Invalid audio filename: {filename!r}")
+        path = os.path.realpath(os.path.join(self.root, filename))
+        if os.path.dirname(path) != self.root:
+            raise ValueError(f"Invalid audio filename: {filename!r}")
+        return path
+
+    async def exists(self, filename: str) -> bool:
+        return await aiofiles.os.path.isfile(self.path_for(filename))
+
+    async def write(self, filename: str, audio: bytes) -> str:
+        """Atomically write audio under filename and return its path"""
+        path = self.path_for(filename)
+        tmp_path = os.path.join(self.root, f".{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(audio)
+            await aiofiles.os.replace(tmp_path, path)
+        except Exception:
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return path
+
+    async def touch(self, filename: str):
+        """Mark an existing file as recently used so the janitor keeps it"""
+        path = self.path_for(filename)
+        await asyncio.get_running_loop().run_in_executor(None, os.utime, path, None)
+
+    def _cleanup(self) -> int:
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.root):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(".tmp"):
+                # Leftovers from interrupted writes
+                if now - stat.st_mtime > 3600:
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+                continue
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+
+        files.sort()
+        total = sum(size for _, _, size in files)
+        removed = 0
+        for mtime, path, size in files:
+            too_old = self.max_age_seconds > 0 and now - mtime > self.max_age_seconds
+            if not too_old and total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    async def cleanup(self) -> int:
+        """Enforce the age and size quotas; returns the number of files removed"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._cleanup)
+
+    async def _run_janitor(self):
+        while True:
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    print(f"🧹 Removed {removed} audio files from {self.root}")
+            except Exception as e:
+                print(f"Error cleaning up audio store: {str(e)}")
+            await asyncio.sleep(self.janitor_interval)
+
+    def start_janitor(self):
+        if self._janitor is None:
+            self._janitor = asyncio.ensure_future(self._run_janitor())
+
+    async def stop_janitor(self):
+        if self._janitor is not None:
+            self._janitor.cancel()
+            try:
+                await self._janitor
+            except asyncio.CancelledError:
+                pass
+            self._janitor = None
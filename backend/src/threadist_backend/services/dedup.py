@@ -0,0 +1,266 @@
+import re
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+import numpy as np
+
+from ..config import Config
+from ..models import RedditPost
+
+# 64 MinHash values in 16 LSH bands of 4: a pair with Jaccard similarity 0.8
+# shares at least one band with probability > 0.999, a pair at 0.3 about 12%
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = np.random.RandomState(0x5EED)
+_PERM_A = _rng.randint(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+_SHINGLE_MIX = _rng.randint(1, 2 ** 62, size=SHINGLE_SIZE, dtype=np.uint64) | np.uint64(1)
+_BAND_MIX = _rng.randint(1, 2 ** 62, size=ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.randint(0, 2 ** 62, size=BANDS, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Rows added since the last merge are looked up in dicts; merge once they
+# reach this many or an eighth of the index, whichever is larger
+MERGE_MIN_ROWS = 1024
+
+T = TypeVar("T")
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """64-bit hashes of the text's word 3-grams (crc32 per word, mixed per position)"""
+    words = _WORD.findall(text.lower())
+    tokens = np.fromiter(map(zlib.crc32, map(str.encode, words)), dtype=np.uint64, count=len(words))
+    if len(tokens) < SHINGLE_SIZE:
+        return tokens * _SHINGLE_MIX[0]
+    count = len(tokens) - SHINGLE_SIZE + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        hashes += tokens[offset:offset + count] * _SHINGLE_MIX[offset]
+    return hashes
+
+
+def minhash_signature(text: Optional[str], min_shingles: int = 1) -> Optional[np.ndarray]:
+    """MinHash signature of text, or None when it has fewer than min_shingles shingles"""
+    if not text:
+        return None
+    hashes = shingle_hashes(text)
+    if len(hashes) < max(1, min_shingles):
+        return None
+    # One multiply-add per permutation; the high 32 bits of the wrapped product are well mixed
+    return ((hashes[:, None] * _PERM_A + _PERM_B) >> _SHIFT).min(axis=0).astype(np.uint32)
+
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return np.count_nonzero(a == b) / NUM_PERM
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """
+    One 64-bit key per band for a signature (or a row per signature for a 2D
+    array). Keys are salted per band, so all bands can share one key space.
+    """
+    bands = signatures.astype(np.uint64).reshape(signatures.shape[:-1] + (BANDS, ROWS))
+    return (bands * _BAND_MIX).sum(axis=-1, dtype=np.uint64) + _BAND_SALT
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hash index of MinHash signatures.
+
+    Signatures and band keys live in growable NumPy arrays. The band keys of
+    all rows are kept in one sorted array, so a query is a single vectorized
+    binary search. Rows added since the last merge sit in a dict until the
+    next merge, so inserts stay cheap and memory stays compact at millions
+    of entries.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        self._band_keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        # row -> key, None once removed
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._sorted_keys = np.empty(0, dtype=np.uint64)
+        self._sorted_rows = np.empty(0, dtype=np.int64)
+        self._pending: Dict[int, List[int]] = {}
+        self._pending_rows = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def signature(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        return None if row is None else self._signatures[row]
+
+    def _reserve(self, rows: int):
+        capacity = max(1, len(self._signatures))
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        signatures[:len(self._keys)] = self._signatures[:len(self._keys)]
+        keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        keys[:len(self._keys)] = self._band_keys[:len(self._keys)]
+        self._signatures, self._band_keys = signatures, keys
+
+    def add(self, key: str, signature: np.ndarray):
+        self.add_many([key], signature[None, :])
+
+    def add_many(self, keys: List[str], signatures: np.ndarray):
+        """Insert signatures (one row per key); an existing key is replaced"""
+        for key in keys:
+            self.remove(key)
+        start = len(self._keys)
+        self._reserve(start + len(keys))
+        self._signatures[start:start + len(keys)] = signatures
+        self._band_keys[start:start + len(keys)] = band_keys(signatures)
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+        self._keys.extend(keys)
+
+        if len(keys) >= MERGE_MIN_ROWS:
+            self._merge()
+            return
+        for row in range(start, start + len(keys)):
+            for band_key in self._band_keys[row].tolist():
+                self._pending.setdefault(band_key, []).append(row)
+        self._pending_rows += len(keys)
+        if self._pending_rows >= max(MERGE_MIN_ROWS, len(self._keys) // 8):
+            self._merge()
+
+    def remove(self, key: str):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        self._keys[row] = None
+        removed = len(self._keys) - len(self._rows)
+        if removed >= max(MERGE_MIN_ROWS, len(self._keys) // 2):
+            self._compact()
+
+    def _compact(self):
+        """Drop removed rows and renumber the rest"""
+        live = np.fromiter(sorted(self._rows.values()), dtype=np.int64, count=len(self._rows))
+        keys = [self._keys[row] for row in live.tolist()]
+        self._signatures = self._signatures[live].copy()
+        self._band_keys = self._band_keys[live].copy()
+        self._keys = keys
+        self._rows = {key: row for row, key in enumerate(keys)}
+        self._merge()
+
+    def _merge(self):
+        """Rebuild the sorted band keys to cover all rows"""
+        keys = self._band_keys[:len(self._keys)].ravel()
+        order = np.argsort(keys)
+        self._sorted_keys = keys[order]
+        self._sorted_rows = order // BANDS
+        self._pending = {}
+        self._pending_rows = 0
+
+    def query(self, signature: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        """Keys whose estimated similarity to signature is at least threshold, most similar first"""
+        keys = band_keys(signature)
+        lo = np.searchsorted(self._sorted_keys, keys, side="left")
+        hi = np.searchsorted(self._sorted_keys, keys, side="right")
+        found = [self._sorted_rows[start:end] for start, end in zip(lo.tolist(), hi.tolist()) if end > start]
+        if self._pending:
+            for band_key in keys.tolist():
+                pending = self._pending.get(band_key)
+                if pending:
+                    found.append(np.asarray(pending, dtype=np.int64))
+        if not found:
+            return []
+
+        rows = np.unique(np.concatenate(found))
+        similarities = np.count_nonzero(self._signatures[rows] == signature, axis=1) / NUM_PERM
+        matches = []
+        for row, similarity in zip(rows.tolist(), similarities.tolist()):
+            key = self._keys[row]
+            if key is not None and similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+
+def story_signature(post: RedditPost) -> Optional[np.ndarray]:
+    return minhash_signature(post.selftext, Config.DUPLICATE_MIN_WORDS)
+
+
+class StoryFingerprints:
+    """
+    Near-duplicate detection for stories: each stored story is fingerprinted
+    once as it is upserted and assigned to the cluster of the first stored
+    story it duplicates (a cross-post or repost).
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold or Config.STORY_DUPLICATE_THRESHOLD
+        self.index = LSHIndex()
+        # post id -> id of the first story seen in its duplicate cluster
+        self._cluster: Dict[str, str] = {}
+
+    def attach(self, story_store):
+        """Fingerprint everything already in the store and follow its changes"""
+        self.add(story_store.all_stories())
+        story_store.add_upsert_listener(self.add)
+        story_store.add_remove_listener(self.remove)
+
+    def add(self, posts: Iterable[RedditPost]):
+        for post in posts:
+            if post.id in self.index:
+                continue
+            signature = story_signature(post)
+            if signature is None:
+                continue
+            matches = self.index.query(signature, self.threshold)
+            self._cluster[post.id] = self._cluster.get(matches[0][0], matches[0][0]) if matches else post.id
+            self.index.add(post.id, signature)
+
+    def remove(self, post_id: str):
+        self.index.remove(post_id)
+        self._cluster.pop(post_id, None)
+
+    def cluster_id(self, post: RedditPost) -> str:
+        return self._cluster.get(post.id, post.id)
+
+    def collapse(
+        self,
+        items: Iterable[T],
+        limit: int,
+        post_of: Callable[[T], RedditPost] = lambda item: item
+    ) -> List[T]:
+        """
+        The first limit items, in order, keeping only the first story of each
+        near-duplicate group. Stored stories are grouped by cluster; stories
+        that never reached the store are compared with what was already kept.
+        """
+        kept: List[T] = []
+        clusters: Set[str] = set()
+        kept_signatures: List[np.ndarray] = []
+        for item in items:
+            if len(kept) >= limit:
+                break
+            post = post_of(item)
+            cluster = self._cluster.get(post.id)
+            if cluster is not None and cluster in clusters:
+                continue
+            signature = self.index.signature(post.id) if cluster is not None else story_signature(post)
+            if signature is not None and kept_signatures:
+                shared = np.count_nonzero(np.stack(kept_signatures) == signature, axis=1)
+                if shared.max() >= self.threshold * NUM_PERM:
+                    continue
+            kept.append(item)
+            clusters.add(cluster or post.id)
+            if signature is not None:
+                kept_signatures.append(signature)
+        return kept
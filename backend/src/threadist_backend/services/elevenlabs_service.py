@@ -1,103 +1,105 @@
-import os
-import uuid
+import time
+from typing import AsyncIterator, Dict, Optional
 from elevenlabs import VoiceSettings
-from elevenlabs.client import ElevenLabs
+from elevenlabs.client import AsyncElevenLabs
 from ..config import Config
 
+class StreamMetrics:
+    """Running time-to-first-byte and total synthesis timings for TTS streams"""
+
+    def __init__(self):
+        self.streams = 0
+        self.failures = 0
+        self.total_ttfb_ms = 0.0
+        self.max_ttfb_ms = 0.0
+        self.last_ttfb_ms: Optional[float] = None
+        self.total_duration_ms = 0.0
+        self.total_bytes = 0
+
+    def record(self, ttfb_ms: Optional[float], duration_ms: float, size: int, failed: bool = False):
+        if failed:
+            self.failures += 1
+            return
+        self.streams += 1
+        self.total_duration_ms += duration_ms
+        self.total_bytes += size
+        if ttfb_ms is not None:
+            self.total_ttfb_ms += ttfb_ms
+            self.max_ttfb_ms = max(self.max_ttfb_ms, ttfb_ms)
+            self.last_ttfb_ms = ttfb_ms
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        streams = max(self.streams, 1)
+        return {
+            "streams": self.streams,
+            "failures": self.failures,
+            "avg_ttfb_ms": round(self.total_ttfb_ms / streams, 1),
+            "max_ttfb_ms": round(self.max_ttfb_ms, 1),
+            "last_ttfb_ms": self.last_ttfb_ms,
+            "avg_duration_ms": round(self.total_duration_ms / streams, 1),
+            "total_bytes": self.total_bytes,
+        }
+
 class ElevenLabsService:
     def __init__(self):
         self.api_key = Config.ELEVENLABS_API_KEY
-        self.client = ElevenLabs(api_key=self.api_key)
+        # Async client so synthesis never blocks the event loop
+        self.client = AsyncElevenLabs(api_key=self.api_key)
         # Default voice ID for a good storytelling voice
         self.default_voice_id = "JBFqnCBsd6RMkjVDRZzb"  # This is a good storytelling voice
-        
-    async def text_to_speech_stream(self, text: str, voice_id: str = None) -> bytes:
+        self.default_model_id = "eleven_turbo_v2_5"  # use the turbo model for low latency
+        self.default_output_format = "mp3_22050_32"
+        self.metrics = StreamMetrics()
+
+    def _voice_settings(self) -> VoiceSettings:
+        return VoiceSettings(
+            stability=0.0,
+            similarity_boost=1.0,
+            style=0.0,
+            use_speaker_boost=True,
+            speed=1.0,
+        )
+
+    async def text_to_speech_stream(
+        self,
+        text: str,
+        voice_id: str = None,
+        model_id: str = None,
+        output_format: str = None
+    ) -> AsyncIterator[bytes]:
         """
-        Convert text to speech and return audio bytes for streaming
+        Convert text to speech, yielding audio chunks as they arrive from ElevenLabs
         """
-        if not voice_id:
-            voice_id = self.default_voice_id
-            
+        started = time.perf_counter()
+        ttfb_ms = None
+        size = 0
+
         try:
-            # Generate audio using the new client API with streaming
-            response = self.client.text_to_speech.convert(
-                voice_id=voice_id,
-                output_format="mp3_22050_32",
+            async for chunk in self.client.text_to_speech.stream(
+                voice_id=voice_id or self.default_voice_id,
+                output_format=output_format or self.default_output_format,
                 text=text,
-                model_id="eleven_turbo_v2_5",  # use the turbo model for low latency
-                voice_settings=VoiceSettings(
-                    stability=0.0,
-                    similarity_boost=1.0,
-                    style=0.0,
-                    use_speaker_boost=True,
-                    speed=1.0,
-                ),
-            )
-            
-            # Convert response to bytes
-            audio_bytes = b""
-            for chunk in response:
-                if chunk:
-                    audio_bytes += chunk
-            
-            return audio_bytes
-            
+                model_id=model_id or self.default_model_id,
+                voice_settings=self._voice_settings(),
+            ):
+                if not chunk:
+                    continue
+                if ttfb_ms is None:
+                    ttfb_ms = (time.perf_counter() - started) * 1000
+                size += len(chunk)
+                yield chunk
         except Exception as e:
+            self.metrics.record(ttfb_ms, 0, size, failed=True)
             raise Exception(f"Error generating speech stream: {str(e)}")
-    
-    async def text_to_speech_file(self, text: str, voice_id: str = None) -> str:
-        """
-        Convert text to speech and save to file (for backward compatibility)
-        """
-        if not voice_id:
-            voice_id = self.default_voice_id
-            
-        try:
-            # Generate audio using the new client API
-            response = self.client.text_to_speech.convert(
-                voice_id=voice_id,
-                output_format="mp3_22050_32",
-                text=text,
-                model_id="eleven_turbo_v2_5",  # use the turbo model for low latency
-                voice_settings=VoiceSettings(
-                    stability=0.0,
-                    similarity_boost=1.0,
-                    style=0.0,
-                    use_speaker_boost=True,
-                    speed=1.0,
-                ),
-            )
 
-            # Generate a unique file name for the output MP3 file
-            save_file_path = f"{uuid.uuid4()}.mp3"
+        self.metrics.record(ttfb_ms, (time.perf_counter() - started) * 1000, size)
 
-            # Writing the audio to a file
-            with open(save_file_path, "wb") as f:
-                for chunk in response:
-                    if chunk:
-                        f.write(chunk)
-
-            return save_file_path
-            
-        except Exception as e:
-            raise Exception(f"Error generating speech: {str(e)}")
-    
     async def get_available_voices(self):
         """
         Get list of available voices
         """
         try:
-            voices = self.client.voices.get_all()
+            voices = await self.client.voices.get_all()
             return voices
         except Exception as e:
             raise Exception(f"Error getting voices: {str(e)}")
-    
-    def cleanup_temp_file(self, file_path: str):
-        """
-        Clean up temporary audio file
-        """
-        try:
-            if os.path.exists(file_path):
-                os.unlink(file_path)
-        except Exception as e:
-            print(f"Error cleaning up temp file: {str(e)}") 
\ No newline at end of file
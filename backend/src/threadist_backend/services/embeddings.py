@@ -0,0 +1,159 @@
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import Config
+from ..models import RedditPost
+from .vector_index import VectorIndex
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Title words say more about a story than any one body word
+TITLE_WEIGHT = 3.0
+
+
+class HashingEmbedder:
+    """
+    CPU-only text embedding: words are hashed into dim signed buckets (the
+    hashing trick), counts are log-scaled and the vector is L2-normalized.
+    No vocabulary or model to load, and stable across processes. Word pairs
+    were tried and left out: at this size their collisions cost more
+    precision than the phrases add.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or Config.EMBEDDING_DIM
+
+    def _features(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        return np.fromiter(map(zlib.crc32, map(str.encode, words)), dtype=np.uint32, count=len(words))
+
+    def _accumulate(self, vector: np.ndarray, text: str, weight: float):
+        hashes = self._features(text)
+        if not len(hashes):
+            return
+        buckets = (hashes % self.dim).astype(np.intp)
+        # The top bit picks the sign, so colliding features tend to cancel out
+        signs = np.where(hashes & np.uint32(0x80000000), -weight, weight)
+        vector += np.bincount(buckets, weights=signs, minlength=self.dim)
+
+    def embed(self, title: str, body: Optional[str] = None) -> Optional[np.ndarray]:
+        """Unit float32 vector for a story, or None when it has no words"""
+        vector = np.zeros(self.dim, dtype=np.float64)
+        self._accumulate(vector, title, TITLE_WEIGHT)
+        if body:
+            self._accumulate(vector, body, 1.0)
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return (vector / norm).astype(np.float32)
+
+
+class StoryEmbeddings:
+    """
+    Embeddings of stored stories, computed once as stories are upserted, with
+    a vector index for "more like this" queries. Document frequencies per
+    bucket are tracked as stories come and go, so queries are IDF-weighted
+    against the current corpus.
+    """
+
+    def __init__(self, embedder: Optional[HashingEmbedder] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.index = VectorIndex(self.embedder.dim)
+        self._document_frequency = np.zeros(self.embedder.dim, dtype=np.int64)
+        # Per-subreddit (sum of vectors, count) for interest profiles
+        self._subreddit_sums: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._subreddit_of: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def attach(self, story_store):
+        """Embed everything already in the store and follow its changes"""
+        self.add(story_store.all_stories())
+        story_store.add_upsert_listener(self.add)
+        story_store.add_remove_listener(self.remove)
+
+    def embed(self, post: RedditPost) -> Optional[np.ndarray]:
+        return self.embedder.embed(post.title, post.selftext)
+
+    def add(self, posts: Iterable[RedditPost]):
+        keys, vectors = [], []
+        for post in posts:
+            if post.id in self.index:
+                continue
+            vector = self.embed(post)
+            if vector is None:
+                continue
+            keys.append(post.id)
+            vectors.append(vector)
+            self._document_frequency += vector != 0
+            subreddit = post.subreddit.lower()
+            total, count = self._subreddit_sums.get(subreddit, (np.zeros(self.embedder.dim, dtype=np.float32), 0))
+            self._subreddit_sums[subreddit] = (total + vector, count + 1)
+            self._subreddit_of[post.id] = subreddit
+        if keys:
+            self.index.add_many(keys, np.stack(vectors))
+
+    def remove(self, post_id: str):
+        vector = self.index.vector(post_id)
+        if vector is None:
+            return
+        self._document_frequency -= vector != 0
+        subreddit = self._subreddit_of.pop(post_id)
+        total, count = self._subreddit_sums[subreddit]
+        if count <= 1:
+            del self._subreddit_sums[subreddit]
+        else:
+            self._subreddit_sums[subreddit] = (total - vector, count - 1)
+        self.index.remove(post_id)
+
+    def vector_for(self, post: RedditPost) -> Optional[np.ndarray]:
+        """Stored embedding of a post, or a fresh one for posts outside the store"""
+        vector = self.index.vector(post.id)
+        return vector if vector is not None else self.embed(post)
+
+    def _weighted_query(self, vector: np.ndarray) -> Optional[np.ndarray]:
+        """Weight a query by IDF so buckets shared by most stories count for little"""
+        documents = max(1, len(self.index))
+        idf = np.log((documents + 1) / (self._document_frequency + 1)) + 1
+        query = vector * idf
+        norm = np.linalg.norm(query)
+        return (query / norm).astype(np.float32) if norm > 0 else None
+
+    def similar(self, post: RedditPost, k: int = 10) -> List[Tuple[str, float]]:
+        """Stored stories most similar to post, as (post id, cosine similarity)"""
+        vector = self.vector_for(post)
+        if vector is None:
+            return []
+        query = self._weighted_query(vector)
+        if query is None:
+            return []
+        return self.index.search(query, k, exclude={post.id})
+
+    def profile(self, subreddit_weights: Dict[str, float]) -> Optional[np.ndarray]:
+        """
+        Interest profile: the weighted mean of the user's subreddits' story
+        centroids, IDF-weighted like a query. None without stored stories.
+        """
+        profile = np.zeros(self.embedder.dim, dtype=np.float32)
+        for subreddit, weight in subreddit_weights.items():
+            entry = self._subreddit_sums.get(subreddit.lower())
+            if entry is not None and weight > 0:
+                total, count = entry
+                profile += weight * total / count
+        if not profile.any():
+            return None
+        return self._weighted_query(profile)
+
+    def similarities(self, posts: List[RedditPost], query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each post to a query vector (0 for posts without words)"""
+        vectors = np.zeros((len(posts), self.embedder.dim), dtype=np.float32)
+        for i, post in enumerate(posts):
+            vector = self.vector_for(post)
+            if vector is not None:
+                vectors[i] = vector
+        return vectors @ query
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class FanOutResult(Dict[Any, Any]):
+    """Results keyed by item, plus the items that failed or were dropped"""
+
+    def __init__(self):
+        super().__init__()
+        self.errors: Dict[Any, str] = {}
+        self.timed_out: list = []
+        self.elapsed: float = 0.0
+
+
+async def fan_out(
+    items: Iterable[K],
+    fetch: Callable[[K], Awaitable[T]],
+    concurrency: int = 5,
+    item_timeout: Optional[float] = None,
+    budget: Optional[float] = None,
+) -> FanOutResult:
+    """
+    Run fetch(item) for every item with bounded concurrency.
+
+    Each call is limited to item_timeout seconds and the whole fan-out to
+    budget seconds. Results are partial: items that fail, time out or are
+    still running when the budget runs out are left out of the result and
+    recorded in errors/timed_out instead.
+    """
+    items = list(dict.fromkeys(items))
+    result = FanOutResult()
+    if not items:
+        return result
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.monotonic()
+
+    async def run(item):
+        async with semaphore:
+            if item_timeout is None:
+                return await fetch(item)
+            return await asyncio.wait_for(fetch(item), timeout=item_timeout)
+
+    tasks = {asyncio.ensure_future(run(item)): item for item in items}
+    done, pending = await asyncio.wait(tasks.keys(), timeout=budget)
+
+    for task in pending:
+        task.cancel()
+        result.timed_out.append(tasks[task])
+    if pending:
+        # Let cancellations settle so no task outlives the request
+        await asyncio.wait(pending)
+
+    for task in done:
+        item = tasks[task]
+        error = task.exception()
+        if error is None:
+            result[item] = task.result()
+        elif isinstance(error, asyncio.TimeoutError):
+            result.timed_out.append(item)
+        else:
+            result.errors[item] = str(error)
+
+    result.elapsed = time.monotonic() - started
+    return result
@@ -0,0 +1,127 @@
+import base64
+import itertools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..config import Config
+from ..models import StoryRecommendation
+
+
+class UserFeed:
+    """A user's ranked candidate list, built once and paged through with cursors"""
+
+    def __init__(self, recommendations: List[StoryRecommendation]):
+        self.recommendations = recommendations
+        self.built_at = time.monotonic()
+        self.version = uuid.uuid4().hex[:8]
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.built_at
+
+    def page(self, offset: int, limit: int) -> Tuple[List[StoryRecommendation], Optional[str]]:
+        """Items from offset and the cursor for the next page, if any"""
+        items = self.recommendations[offset:offset + limit]
+        next_offset = offset + len(items)
+        next_cursor = encode_cursor(self.version, next_offset) if next_offset < len(self.recommendations) else None
+        return items, next_cursor
+
+
+def encode_cursor(version: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode().rstrip("=")
+
+
+class StaleCursorError(Exception):
+    """The cursor belongs to a feed that is no longer kept; restart from the first page"""
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Returns (feed version, offset); raises ValueError for malformed cursors"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        version, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        return version, max(0, int(offset))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+class UserFeedCache:
+    """
+    Bounded LRU of per-user feeds. Besides the current feed, the last few
+    feeds a user was served stay reachable by version, so cursors handed
+    out before a rebuild keep paging through the list they came from.
+
+    Each user also has a generation, replaced whenever their feed is
+    invalidated, so a build started before the change can tell that its
+    result is stale. Generations are evicted along with the user's feeds.
+    """
+
+    def __init__(self, max_users: Optional[int] = None, retained_feeds: int = 2):
+        self.max_users = max_users or Config.USER_FEED_MAX_USERS
+        self.retained_feeds = retained_feeds
+        self._feeds: "OrderedDict[str, Optional[UserFeed]]" = OrderedDict()
+        # user id -> version -> feed, oldest first
+        self._versions: Dict[str, "OrderedDict[str, UserFeed]"] = {}
+        self._generations: Dict[str, int] = {}
+        # Never reused, so a generation from before an eviction cannot match again
+        self._next_generation = itertools.count(1)
+
+    def get(self, user_id: str) -> Optional[UserFeed]:
+        feed = self._feeds.get(user_id)
+        if user_id in self._feeds:
+            self._feeds.move_to_end(user_id)
+        return feed
+
+    def get_version(self, user_id: str, version: str) -> Optional[UserFeed]:
+        """The user's current or a retained feed with this version"""
+        return self._versions.get(user_id, {}).get(version)
+
+    def put(self, user_id: str, feed: UserFeed):
+        """Make feed the user's current feed"""
+        self.retain(user_id, feed)
+        self._feeds[user_id] = feed
+
+    def retain(self, user_id: str, feed: UserFeed):
+        """Keep feed reachable by its cursors without serving it as the current feed"""
+        versions = self._versions.setdefault(user_id, OrderedDict())
+        versions[feed.version] = feed
+        self._touch(user_id)
+        # The current feed plus retained_feeds others; the current one is never dropped
+        current = self._feeds[user_id]
+        while len(versions) > self.retained_feeds + 1:
+            oldest = next(version for version in versions if current is None or version != current.version)
+            del versions[oldest]
+        self._evict()
+
+    def generation(self, user_id: str) -> int:
+        """The user's current generation, to compare against with is_current later"""
+        if user_id not in self._generations:
+            self._generations[user_id] = next(self._next_generation)
+            self._touch(user_id)
+            self._evict()
+        return self._generations[user_id]
+
+    def is_current(self, user_id: str, generation: int) -> bool:
+        """False once the user's feed was invalidated or evicted after generation was read"""
+        return self._generations.get(user_id) == generation
+
+    def invalidate(self, user_id: str):
+        """Drop the user's feeds and start a new generation"""
+        self._versions.pop(user_id, None)
+        self._feeds[user_id] = None
+        self._generations[user_id] = next(self._next_generation)
+        self._touch(user_id)
+        self._evict()
+
+    def _touch(self, user_id: str):
+        if user_id not in self._feeds:
+            self._feeds[user_id] = None
+        self._feeds.move_to_end(user_id)
+
+    def _evict(self):
+        while len(self._feeds) > self.max_users:
+            evicted, _ = self._feeds.popitem(last=False)
+            self._versions.pop(evicted, None)
+            self._generations.pop(evicted, None)
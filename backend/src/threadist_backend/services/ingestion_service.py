@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from ..config import Config
+from .fanout import fan_out
+from .recommendation_service import RecommendationService
+from .reddit_scheduler import BACKGROUND
+from .reddit_service import NO_DEADLINE, RedditService
+from .story_store import StoryStore
+from .supabase_service import SupabaseService
+
+
+class IngestionService:
+    """
+    Background crawler that keeps the story store filled.
+
+    Every INGESTION_INTERVAL_SECONDS it pulls each configured sort for every
+    tracked subreddit (category_subreddits plus the default and trending
+    lists) at background priority, and upserts the stories into the store.
+    """
+
+    def __init__(
+        self,
+        reddit_service: RedditService,
+        supabase_service: SupabaseService,
+        story_store: StoryStore
+    ):
+        self.reddit_service = reddit_service
+        self.supabase_service = supabase_service
+        self.story_store = story_store
+        self.sorts = [sort.strip() for sort in Config.INGESTION_SORTS.split(",") if sort.strip()]
+        self.last_run: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def tracked_subreddits(self) -> List[str]:
+        """Every subreddit the app can recommend from, deduplicated case-insensitively"""
+        category_subreddits = await self.supabase_service.get_category_subreddits()
+        names = (
+            [cs.subreddit for cs in category_subreddits]
+            + RecommendationService.DEFAULT_SUBREDDITS
+            + RecommendationService.TRENDING_SUBREDDITS
+        )
+        unique = {}
+        for name in names:
+            unique.setdefault(name.lower(), name)
+        return list(unique.values())
+
+    async def run_once(self) -> dict:
+        """Crawl every tracked listing once and upsert the results"""
+        started = time.monotonic()
+        subreddits = await self.tracked_subreddits()
+        listings: List[Tuple[str, str]] = [(subreddit, sort) for subreddit in subreddits for sort in self.sorts]
+
+        async def crawl(listing: Tuple[str, str]):
+            subreddit, sort = listing
+            posts = await self.reddit_service.fetch_subreddit_stories(
+                subreddit,
+                limit=Config.INGESTION_LISTING_LIMIT,
+                sort=sort,
+                priority=BACKGROUND,
+                # Background crawls have no caller waiting on them, and the
+                # rate limiter slows them down on purpose
+                time_budget=NO_DEADLINE
+            )
+            return self.story_store.upsert_listing(subreddit, sort, posts)
+
+        results = await fan_out(listings, crawl, concurrency=Config.INGESTION_CONCURRENCY)
+        for (subreddit, sort), error in results.errors.items():
+            print(f"Error ingesting r/{subreddit}/{sort}: {error}")
+        for subreddit, sort in results.timed_out:
+            print(f"Timed out ingesting r/{subreddit}/{sort}")
+
+        self.last_run = {
+            "listings": len(listings),
+            "failed": len(results.errors),
+            "timed_out": len(results.timed_out),
+            "new_stories": sum(len(added) for added in results.values()),
+            "stored_stories": len(self.story_store),
+            "duration_seconds": round(time.monotonic() - started, 2),
+            "finished_at": time.time(),
+        }
+        return self.last_run
+
+    async def _run_forever(self):
+        while True:
+            try:
+                summary = await self.run_once()
+                print(
+                    f"📥 Ingested {summary['new_stories']} new stories "
+                    f"from {summary['listings']} listings in {summary['duration_seconds']}s"
+                )
+            except Exception as e:
+                print(f"Error running story ingestion: {str(e)}")
+            await asyncio.sleep(Config.INGESTION_INTERVAL_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
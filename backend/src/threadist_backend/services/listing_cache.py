@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from ..config import Config
+from ..models import RedditPost
+from .singleflight import SingleFlight
+
+# Listings are fetched at one of these sizes and sliced down to the requested
+# limit, so nearby limits share a cache entry
+LIMIT_BUCKETS = (25, 50, 100)
+
+# (fetched_at, posts)
+CachedListing = Tuple[float, List[RedditPost]]
+
+
+def limit_bucket(limit: int) -> int:
+    for bucket in LIMIT_BUCKETS:
+        if limit <= bucket:
+            return bucket
+    return LIMIT_BUCKETS[-1]
+
+
+class MemoryListingBackend:
+    """In-process LRU of listings"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, CachedListing]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedListing]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, listing = item
+        if time.time() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return listing
+
+    async def set(self, key: str, listing: CachedListing, ttl: float):
+        self._entries[key] = (time.time() + ttl, listing)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisListingBackend:
+    """Listings shared across workers through Redis"""
+
+    def __init__(self, url: str, prefix: str = "threadist:listing:"):
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self.redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[CachedListing]:
+        raw = await self.redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["fetched_at"], [RedditPost(**post) for post in data["posts"]]
+
+    async def set(self, key: str, listing: CachedListing, ttl: float):
+        fetched_at, posts = listing
+        payload = json.dumps({
+            "fetched_at": fetched_at,
+            "posts": [post.model_dump() for post in posts],
+        })
+        await self.redis.set(self.prefix + key, payload, ex=max(1, int(ttl)))
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class ListingCache:
+    """
+    TTL cache for subreddit listings with stale-while-revalidate.
+
+    Entries are fresh for a per-sort TTL. After that they are still served for
+    LISTING_CACHE_STALE_SECONDS while one background refresh runs, and
+    concurrent misses for the same listing share a single upstream call.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryListingBackend(Config.LISTING_CACHE_MAX_ENTRIES)
+        self.stale_seconds = Config.LISTING_CACHE_STALE_SECONDS
+        self.ttls = {
+            'hot': Config.LISTING_CACHE_TTL_HOT,
+            'new': Config.LISTING_CACHE_TTL_NEW,
+            'rising': Config.LISTING_CACHE_TTL_RISING,
+            'top': Config.LISTING_CACHE_TTL_TOP,
+        }
+        self._flights = SingleFlight()
+        self._refreshes: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls) -> "ListingCache":
+        if Config.LISTING_CACHE_BACKEND == "redis":
+            return cls(RedisListingBackend(Config.REDIS_URL))
+        return cls()
+
+    def _ttl(self, sort: str) -> float:
+        return self.ttls.get(sort, Config.LISTING_CACHE_TTL_HOT)
+
+    async def _read(self, key: str) -> Optional[CachedListing]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            print(f"Error reading listing cache: {str(e)}")
+            return None
+
+    async def _refresh(
+        self,
+        key: str,
+        sort: str,
+        fetch: Callable[[], Awaitable[List[RedditPost]]]
+    ) -> List[RedditPost]:
+        posts = await fetch()
+        try:
+            await self.backend.set(key, (time.time(), posts), self._ttl(sort) + self.stale_seconds)
+        except Exception as e:
+            print(f"Error writing listing cache: {str(e)}")
+        return posts
+
+    def _refresh_in_background(self, key: str, sort: str, fetch: Callable[[], Awaitable[List[RedditPost]]]):
+        if self._flights.in_flight(key):
+            return
+
+        async def refresh():
+            try:
+                await self._flights.do(key, lambda: self._refresh(key, sort, fetch))
+            except Exception as e:
+                print(f"Error refreshing listing {key}: {str(e)}")
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def get_or_fetch(
+        self,
+        subreddit: str,
+        sort: str,
+        limit: int,
+        fetch: Callable[[int], Awaitable[List[RedditPost]]],
+        refresh_fetch: Optional[Callable[[int], Awaitable[List[RedditPost]]]] = None
+    ) -> List[RedditPost]:
+        """
+        Return up to limit posts for the listing. fetch(bucket) loads it from
+        Reddit on a miss; refresh_fetch, if given, is used for background
+        revalidation instead.
+        """
+        bucket = limit_bucket(limit)
+        key = f"{subreddit.lower()}:{sort}:{bucket}"
+
+        cached = await self._read(key)
+        if cached is not None:
+            fetched_at, posts = cached
+            age = time.time() - fetched_at
+            if age >= self._ttl(sort):
+                refresher = refresh_fetch or fetch
+                self._refresh_in_background(key, sort, lambda: refresher(bucket))
+            return posts[:limit]
+
+        posts = await self._flights.do(key, lambda: self._refresh(key, sort, lambda: fetch(bucket)))
+        return posts[:limit]
+
+    async def close(self):
+        for task in list(self._refreshes):
+            task.cancel()
+        await self.backend.close()
@@ -0,0 +1,249 @@
+import asyncio
+import re
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from ..config import Config
+from .audio_cache import AudioCache, audio_cache_key
+from .audio_store import AudioStore
+from .dedup import LSHIndex, minhash_signature
+from .elevenlabs_service import ElevenLabsService
+
+# Size of the slices cached audio is streamed back in
+CACHED_CHUNK_SIZE = 64 * 1024
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+")
+
+def split_narration_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into pieces of at most max_chars, breaking at paragraph and
+    then sentence boundaries, and only mid-sentence when a sentence alone
+    is too long.
+    """
+    # (piece, starts_paragraph) pairs, each at most max_chars long
+    pieces = []
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append((paragraph, True))
+            continue
+        starts_paragraph = True
+        for sentence in _SENTENCE_END.split(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append((sentence[:cut].strip(), starts_paragraph))
+                sentence = sentence[cut:].strip()
+                starts_paragraph = False
+            if sentence:
+                pieces.append((sentence, starts_paragraph))
+                starts_paragraph = False
+
+    # Greedily pack consecutive pieces back together up to max_chars
+    chunks: List[str] = []
+    for piece, starts_paragraph in pieces:
+        separator = "\n\n" if starts_paragraph else " "
+        if chunks and len(chunks[-1]) + len(separator) + len(piece) <= max_chars:
+            chunks[-1] = chunks[-1] + separator + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+class NarrationService:
+    """Serves story narration, answering from the audio cache before calling ElevenLabs"""
+
+    def __init__(
+        self,
+        elevenlabs_service: ElevenLabsService,
+        audio_cache: Optional[AudioCache] = None,
+        audio_store: Optional[AudioStore] = None
+    ):
+        self.elevenlabs_service = elevenlabs_service
+        self.audio_cache = audio_cache or AudioCache()
+        self.audio_store = audio_store or AudioStore()
+        # Fingerprints of narrated text per (settings, tier), so a cross-posted
+        # story reuses the audio synthesized for its first copy
+        self._narrated: Dict[str, LSHIndex] = {}
+        # (namespace, key) of every fingerprint, least recently reused first,
+        # so the indexes stay within TTS_DUPLICATE_MAX_ENTRIES
+        self._narrated_order: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+
+    def cache_key(self, text: str, voice_id: str = None, model_id: str = None, output_format: str = None) -> str:
+        """Content address of the clip ElevenLabs would produce for these settings"""
+        service = self.elevenlabs_service
+        return audio_cache_key(
+            text,
+            voice_id or service.default_voice_id,
+            model_id or service.default_model_id,
+            output_format or service.default_output_format,
+            service._voice_settings().dict()
+        )
+
+    async def _duplicate_key(
+        self,
+        text: str,
+        key: str,
+        namespace: str,
+        exists: Callable[[str], Awaitable[bool]]
+    ) -> str:
+        """Key of existing audio for a near-duplicate of text, or key itself"""
+        index = self._narrated.get(namespace)
+        if index is None or await exists(key):
+            return key
+        signature = minhash_signature(text, Config.DUPLICATE_MIN_WORDS)
+        if signature is None:
+            return key
+        for match_key, _ in index.query(signature, Config.TTS_DUPLICATE_THRESHOLD):
+            if await exists(match_key):
+                if (namespace, match_key) in self._narrated_order:
+                    self._narrated_order.move_to_end((namespace, match_key))
+                return match_key
+            # The audio was evicted; forget its fingerprint
+            self._forget_narration(namespace, match_key)
+        return key
+
+    def _remember_narration(self, text: str, key: str, namespace: str):
+        signature = minhash_signature(text, Config.DUPLICATE_MIN_WORDS)
+        if signature is None:
+            return
+        index = self._narrated.setdefault(namespace, LSHIndex())
+        if key in index:
+            index.remove(key)
+        index.add(key, signature)
+        self._narrated_order[(namespace, key)] = None
+        self._narrated_order.move_to_end((namespace, key))
+        while len(self._narrated_order) > Config.TTS_DUPLICATE_MAX_ENTRIES:
+            (old_namespace, old_key), _ = self._narrated_order.popitem(last=False)
+            self._forget_narration(old_namespace, old_key)
+
+    def _forget_narration(self, namespace: str, key: str):
+        self._narrated_order.pop((namespace, key), None)
+        index = self._narrated.get(namespace)
+        if index is None:
+            return
+        index.remove(key)
+        if not len(index):
+            del self._narrated[namespace]
+
+    async def _cached(self, key: str) -> bool:
+        return key in self.audio_cache
+
+    async def stream(
+        self,
+        text: str,
+        voice_id: str = None,
+        model_id: str = None,
+        output_format: str = None
+    ) -> AsyncIterator[bytes]:
+        """Yield narration audio, from the cache when possible"""
+        key = self.cache_key(text, voice_id, model_id, output_format)
+        # The key of empty text identifies just the voice settings
+        namespace = "cache:" + self.cache_key("", voice_id, model_id, output_format)
+        cached = await self.audio_cache.get(await self._duplicate_key(text, key, namespace, self._cached))
+        if cached is not None:
+            for start in range(0, len(cached), CACHED_CHUNK_SIZE):
+                yield cached[start:start + CACHED_CHUNK_SIZE]
+            return
+
+        chunks = []
+        async for chunk in self.elevenlabs_service.text_to_speech_stream(text, voice_id, model_id, output_format):
+            chunks.append(chunk)
+            yield chunk
+
+        # Only complete clips are cached; a client disconnect never gets here
+        await self.audio_cache.put(key, b"".join(chunks))
+        self._remember_narration(text, key, namespace)
+
+    async def stream_long(
+        self,
+        text: str,
+        voice_id: str = None,
+        model_id: str = None,
+        output_format: str = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Narrate text of any length as one continuous stream. The text is split
+        at sentence/paragraph boundaries; the first piece is streamed live so
+        playback starts right away while later pieces are synthesized by a
+        bounded pool of workers and emitted in order. At most
+        TTS_LONGFORM_WORKERS ElevenLabs calls run at once, the live one
+        included, and only that many pieces are synthesized ahead.
+        """
+        chunks = split_narration_text(text, Config.TTS_CHUNK_MAX_CHARS)
+        if len(chunks) <= 1:
+            async for audio in self.stream(text, voice_id, model_id, output_format):
+                yield audio
+            return
+
+        workers = max(1, Config.TTS_LONGFORM_WORKERS)
+        semaphore = asyncio.Semaphore(workers)
+        later = iter(chunks[1:])
+        # In text order; the head stays here until its audio has been yielded
+        pending: "deque[asyncio.Future]" = deque()
+
+        async def synthesize_piece(piece: str) -> bytes:
+            async with semaphore:
+                return await self.synthesize(piece, voice_id, model_id, output_format)
+
+        def fill_window():
+            while len(pending) < workers:
+                piece = next(later, None)
+                if piece is None:
+                    return
+                pending.append(asyncio.ensure_future(synthesize_piece(piece)))
+
+        try:
+            # Taken before any worker starts, so the live piece goes first
+            async with semaphore:
+                fill_window()
+                async for audio in self.stream(chunks[0], voice_id, model_id, output_format):
+                    yield audio
+            while pending:
+                audio = await pending[0]
+                pending.popleft()
+                fill_window()
+                yield audio
+        finally:
+            # A disconnect or failure leaves pieces in flight; stop them and
+            # collect their outcomes so no exception goes unretrieved
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def synthesize(
+        self,
+        text: str,
+        voice_id: str = None,
+        model_id: str = None,
+        output_format: str = None
+    ) -> bytes:
+        """Return the complete narration clip, from the cache when possible"""
+        chunks = []
+        async for chunk in self.stream(text, voice_id, model_id, output_format):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def generate_file(self, text: str, voice_id: str = None) -> str:
+        """Write narration to a content-addressed MP3 in the audio store and return its filename"""
+        namespace = "file:" + self.cache_key("", voice_id)
+        stored = await self._duplicate_key(
+            text,
+            self.cache_key(text, voice_id),
+            namespace,
+            lambda key: self.audio_store.exists(f"{key}.mp3")
+        )
+        filename = f"{stored}.mp3"
+        if await self.audio_store.exists(filename):
+            await self.audio_store.touch(filename)
+            return filename
+
+        chunks = []
+        async for chunk in self.stream_long(text, voice_id):
+            chunks.append(chunk)
+        await self.audio_store.write(filename, b"".join(chunks))
+        self._remember_narration(text, stored, namespace)
+
+        return filename
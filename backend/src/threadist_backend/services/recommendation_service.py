@@ -1,90 +1,258 @@
-from typing import List, Dict, Any
+import asyncio
+import numpy as np
+from typing import List, Dict, Any, Optional, Set, Tuple
+from ..config import Config
 from ..models import RedditPost, StoryRecommendation, UserInterest, CategorySubreddit
+from .dedup import StoryFingerprints
+from .embeddings import StoryEmbeddings
+from .fanout import fan_out
+from .feed_cache import StaleCursorError, UserFeed, UserFeedCache, decode_cursor
+from .reddit_scheduler import BACKGROUND, INTERACTIVE
 from .reddit_service import RedditService
+from .scoring import CandidateBatch, score_batch, top_k
+from .singleflight import SingleFlight
+from .story_store import StoryStore
 from .supabase_service import SupabaseService
 
 class RecommendationService:
-    def __init__(self):
-        self.reddit_service = RedditService()
-        self.supabase_service = SupabaseService()
+    # Popular story subreddits used when a user has no interests yet
+    DEFAULT_SUBREDDITS = [
+        'nosleep', 'tifu', 'relationship_advice', 'AmItheAsshole', 'entitledparents'
+    ]
+    
+    TRENDING_SUBREDDITS = [
+        'nosleep', 'tifu', 'relationship_advice', 'AmItheAsshole', 
+        'entitledparents', 'maliciouscompliance', 'pettyrevenge'
+    ]
+    
+    def __init__(
+        self,
+        reddit_service: Optional[RedditService] = None,
+        supabase_service: Optional[SupabaseService] = None,
+        story_store: Optional[StoryStore] = None
+    ):
+        # Share the app-wide services (and their connection pools) when provided
+        self.reddit_service = reddit_service or RedditService()
+        self.supabase_service = supabase_service or SupabaseService()
+        # Filled by the ingestion worker; listings found here never hit Reddit
+        self.story_store = story_store if story_store is not None else StoryStore()
+        # Cross-posts and reposts are recommended once
+        self.story_fingerprints = StoryFingerprints()
+        self.story_fingerprints.attach(self.story_store)
+        # Text embeddings for "more like this" and content-based scoring
+        self.story_embeddings = StoryEmbeddings()
+        self.story_embeddings.attach(self.story_store)
+        
+        # Ranked per-user candidate lists, paged through with cursors
+        self.feed_cache = UserFeedCache()
+        self._feed_flights = SingleFlight()
+        self._feed_refreshes: Set[asyncio.Task] = set()
+        self.supabase_service.add_interest_change_listener(self.invalidate_user_feed)
     
     async def get_recommended_stories(self, user_id: str, limit: int = 10) -> List[StoryRecommendation]:
         """Get personalized story recommendations based on user interests"""
+        recommendations, _ = await self.get_recommended_page(user_id, limit)
+        return recommendations
+    
+    async def get_recommended_page(
+        self,
+        user_id: str,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[StoryRecommendation], Optional[str]]:
+        """
+        Get a page of the user's cached recommendation feed and the cursor for
+        the next page. A cursor pages through the feed it was issued for, even
+        after a rebuild. Raises ValueError for a malformed cursor and
+        StaleCursorError when its feed is no longer kept.
+        """
+        current = self.feed_cache.get(user_id)
+        if current is not None and current.age > Config.USER_FEED_TTL:
+            # Serve the current feed and rebuild it for the next request
+            self._refresh_user_feed_in_background(user_id)
+        
+        if cursor:
+            version, offset = decode_cursor(cursor)
+            feed = self.feed_cache.get_version(user_id, version)
+            if feed is None:
+                raise StaleCursorError("Recommendations changed; load them again without a cursor")
+            return feed.page(offset, limit)
+        
+        feed = current if current is not None else await self._refresh_user_feed(user_id)
+        return feed.page(0, limit)
+    
+    def invalidate_user_feed(self, user_id: str):
+        """Drop a user's feed after their interests change and rebuild it in the background"""
+        self.feed_cache.invalidate(user_id)
+        self._refresh_user_feed_in_background(user_id)
+    
+    async def _refresh_user_feed(self, user_id: str, priority: int = INTERACTIVE) -> UserFeed:
+        generation = self.feed_cache.generation(user_id)
+        
+        async def build() -> UserFeed:
+            recommendations, complete = await self._rank_recommended_stories(
+                user_id, Config.USER_FEED_SIZE, priority
+            )
+            feed = UserFeed(recommendations)
+            # A feed built from interests that changed meanwhile is never cached
+            if self.feed_cache.is_current(user_id, generation):
+                if complete:
+                    self.feed_cache.put(user_id, feed)
+                else:
+                    # A fallback after a failure: page through it, but rebuild on the next request
+                    self.feed_cache.retain(user_id, feed)
+            return feed
+        
+        return await self._feed_flights.do((user_id, generation), build)
+    
+    def _refresh_user_feed_in_background(self, user_id: str):
+        async def refresh():
+            try:
+                # Nobody waits on this rebuild, so it yields to live requests
+                await self._refresh_user_feed(user_id, BACKGROUND)
+            except Exception as e:
+                print(f"Error refreshing feed for user {user_id}: {str(e)}")
+        
+        task = asyncio.ensure_future(refresh())
+        self._feed_refreshes.add(task)
+        task.add_done_callback(self._feed_refreshes.discard)
+    
+    async def _rank_recommended_stories(
+        self,
+        user_id: str,
+        limit: int,
+        priority: int = INTERACTIVE
+    ) -> Tuple[List[StoryRecommendation], bool]:
+        """
+        Run the full recommendation pipeline and return the top limit stories,
+        and whether they are complete: False when a failure (a database error
+        or subreddits that could not be fetched) forced a fallback or a partial
+        list, which must not be cached as the user's feed.
+        """
         try:
             # Get user interests
-            user_interests = await self.supabase_service.get_user_interests(user_id)
+            user_interests = await self.supabase_service.get_user_interests(user_id, raise_errors=True)
             
             if not user_interests:
                 # If no interests, return popular stories from default subreddits
-                return await self._get_default_stories(limit)
+                return await self._get_default_stories(limit, priority), True
             
-            # Get subreddits from user interests
-            subreddits = []
-            for interest in user_interests:
-                category_subreddits = await self.supabase_service.get_category_subreddits(interest.csid)
-                subreddits.extend([cs.subreddit for cs in category_subreddits])
+            # Resolve all interests (csids) to subreddits in one batched lookup
+            category_subreddits = await self.supabase_service.resolve_interest_subreddits(
+                user_interests, raise_errors=True
+            )
             
-            # Remove duplicates
-            subreddits = list(set(subreddits))
+            # Aggregate interest weights per subreddit, heaviest first
+            interest_index = self._build_interest_index(user_interests, category_subreddits)
+            names: Dict[str, str] = {}
+            for cs in category_subreddits.values():
+                names.setdefault(cs.subreddit.lower(), cs.subreddit)
+            subreddits = sorted(
+                names.values(),
+                key=lambda name: interest_index.get(name.lower(), 0),
+                reverse=True
+            )
             
             if not subreddits:
-                return await self._get_default_stories(limit)
+                return await self._get_default_stories(limit, priority), True
             
             # Get stories from user's interested subreddits
-            all_stories = []
             stories_per_subreddit = max(1, limit // len(subreddits))
+            failed: Set[str] = set()
+            all_stories = await self._fetch_subreddit_stories(
+                subreddits[:5],  # Limit to top 5 subreddits
+                limit=stories_per_subreddit,
+                sort='hot',
+                failed=failed,
+                priority=priority
+            )
             
-            for subreddit in subreddits[:5]:  # Limit to top 5 subreddits
-                try:
-                    stories = await self.reddit_service.get_subreddit_stories(
-                        subreddit, 
-                        limit=stories_per_subreddit,
-                        sort='hot'
-                    )
-                    all_stories.extend(stories)
-                except Exception as e:
-                    print(f"Error getting stories from {subreddit}: {str(e)}")
-                    continue
+            # Score every candidate in one vectorized pass and keep the top limit
+            batch = CandidateBatch.from_posts(all_stories)
+            scores = score_batch(
+                batch,
+                self._subreddit_boosts(batch, interest_index),
+                content_boosts=self._content_boosts(all_stories, interest_index)
+            )
             
-            # Score and rank stories
-            recommendations = []
-            for story in all_stories:
-                score = self._calculate_story_score(story, user_interests)
-                recommendation = StoryRecommendation(
-                    post=story,
-                    score=score,
-                    reason=self._get_recommendation_reason(story, user_interests)
+            # Over-select so collapsing near-duplicates still leaves limit stories
+            order = top_k(scores, limit * 2)
+            ranked = self.story_fingerprints.collapse(order.tolist(), limit, lambda i: all_stories[i])
+            if len(ranked) < limit and len(order) < len(all_stories):
+                ranked = self.story_fingerprints.collapse(
+                    top_k(scores, len(all_stories)).tolist(), limit, lambda i: all_stories[i]
                 )
-                recommendations.append(recommendation)
             
-            # Sort by score and return top recommendations
-            recommendations.sort(key=lambda x: x.score, reverse=True)
-            return recommendations[:limit]
+            recommendations = []
+            for i in ranked:
+                story = all_stories[i]
+                recommendations.append(StoryRecommendation(
+                    post=story,
+                    score=float(scores[i]),
+                    reason=self._get_recommendation_reason(story, interest_index)
+                ))
+            return recommendations, not failed
             
         except Exception as e:
             print(f"Error getting recommended stories: {str(e)}")
-            return await self._get_default_stories(limit)
+            return await self._get_default_stories(limit, priority), False
     
-    async def _get_default_stories(self, limit: int) -> List[StoryRecommendation]:
-        """Get default stories from popular story subreddits"""
-        default_subreddits = [
-            'nosleep', 'tifu', 'relationship_advice', 'AmItheAsshole', 'entitledparents'
-        ]
+    async def _fetch_subreddit_stories(
+        self,
+        subreddits: List[str],
+        limit: int,
+        sort: str,
+        failed: Optional[Set[str]] = None,
+        priority: int = INTERACTIVE
+    ) -> List[RedditPost]:
+        """
+        Get stories from several subreddits: from the ingested story store when
+        the listing has been crawled, otherwise concurrently from Reddit within
+        the latency budget. Subreddits that failed or timed out are added to failed.
+        """
+        stored = {
+            subreddit: self.story_store.get_listing(subreddit, sort, limit)
+            for subreddit in subreddits
+            if self.story_store.has_listing(subreddit, sort)
+        }
+        missing = [subreddit for subreddit in subreddits if subreddit not in stored]
+        
+        async def fetch(subreddit: str) -> List[RedditPost]:
+            return await self.reddit_service.get_subreddit_stories(subreddit, limit=limit, sort=sort, priority=priority)
         
+        results = await fan_out(
+            missing,
+            fetch,
+            concurrency=Config.RECOMMENDATION_FANOUT_CONCURRENCY,
+            item_timeout=Config.SUBREDDIT_FETCH_TIMEOUT,
+            budget=Config.RECOMMENDATION_LATENCY_BUDGET
+        )
+        
+        for subreddit, error in results.errors.items():
+            print(f"Error getting stories from {subreddit}: {error}")
+        if results.timed_out:
+            print(f"Dropped slow subreddits: {', '.join(results.timed_out)}")
+        if failed is not None:
+            failed.update(results.errors)
+            failed.update(results.timed_out)
+        
+        # Keep the caller's subreddit order so ranking ties stay deterministic
         all_stories = []
-        stories_per_subreddit = max(1, limit // len(default_subreddits))
+        for subreddit in subreddits:
+            all_stories.extend(stored[subreddit] if subreddit in stored else results.get(subreddit, []))
+        return all_stories
+    
+    async def _get_default_stories(self, limit: int, priority: int = INTERACTIVE) -> List[StoryRecommendation]:
+        """Get default stories from popular story subreddits"""
+        default_subreddits = self.DEFAULT_SUBREDDITS
         
-        for subreddit in default_subreddits:
-            try:
-                stories = await self.reddit_service.get_subreddit_stories(
-                    subreddit,
-                    limit=stories_per_subreddit,
-                    sort='hot'
-                )
-                all_stories.extend(stories)
-            except Exception as e:
-                print(f"Error getting default stories from {subreddit}: {str(e)}")
-                continue
+        stories_per_subreddit = max(1, limit // len(default_subreddits))
+        all_stories = await self._fetch_subreddit_stories(
+            default_subreddits,
+            limit=stories_per_subreddit,
+            sort='hot',
+            priority=priority
+        )
         
         recommendations = []
         for story in all_stories:
@@ -96,33 +264,40 @@ class RecommendationService:
             recommendations.append(recommendation)
         
         recommendations.sort(key=lambda x: x.score, reverse=True)
-        return recommendations[:limit]
+        return self.story_fingerprints.collapse(recommendations, limit, lambda rec: rec.post)
     
-    def _calculate_story_score(self, story: RedditPost, user_interests: List[UserInterest]) -> float:
-        """Calculate a personalized score for a story based on user interests"""
-        base_score = story.score
-        
-        # Boost score if story is from a subreddit the user is interested in
-        interest_boost = 0
+    @staticmethod
+    def _build_interest_index(
+        user_interests: List[UserInterest],
+        category_subreddits: Dict[str, CategorySubreddit]
+    ) -> Dict[str, int]:
+        """Map each of the user's subreddits (lowercased) to its summed interest weight"""
+        index: Dict[str, int] = {}
         for interest in user_interests:
-            # This is a simplified scoring - in a real implementation,
-            # you'd check if the story's subreddit matches the user's interests
-            if interest.weight > 1:
-                interest_boost += interest.weight * 10
-        
-        # Boost score for newer stories
-        import time
-        current_time = time.time()
-        age_in_hours = (current_time - story.created_utc) / 3600
-        recency_boost = max(0, 100 - age_in_hours)  # Newer stories get higher boost
-        
-        # Boost score for stories with more comments (engagement)
-        engagement_boost = min(story.num_comments * 2, 100)
-        
-        final_score = base_score + interest_boost + recency_boost + engagement_boost
-        return final_score
+            cs = category_subreddits.get(interest.csid)
+            if cs is not None:
+                key = cs.subreddit.lower()
+                index[key] = index.get(key, 0) + interest.weight
+        return index
     
-    def _get_recommendation_reason(self, story: RedditPost, user_interests: List[UserInterest]) -> str:
+    def _subreddit_boosts(self, batch: CandidateBatch, interest_index: Dict[str, int]) -> np.ndarray:
+        """Interest boost for each subreddit in the batch"""
+        boosts = np.zeros(len(batch.subreddits))
+        for i, subreddit in enumerate(batch.subreddits):
+            weight = interest_index.get(subreddit, 0)
+            if weight > 1:
+                boosts[i] = weight * 10
+        return boosts
+    
+    def _content_boosts(self, stories: List[RedditPost], interest_index: Dict[str, int]) -> Optional[np.ndarray]:
+        """Boost for stories whose text resembles what the user's subreddits post"""
+        profile = self.story_embeddings.profile(interest_index)
+        if profile is None or not stories:
+            return None
+        similarities = self.story_embeddings.similarities(stories, profile)
+        return Config.RECOMMENDATION_SIMILARITY_WEIGHT * np.clip(similarities, 0, None)
+    
+    def _get_recommendation_reason(self, story: RedditPost, interest_index: Dict[str, int]) -> str:
         """Generate a human-readable reason for the recommendation"""
         reasons = []
         
@@ -133,37 +308,45 @@ class RecommendationService:
             reasons.append("Very engaging")
         
         # Check if it's from a subreddit the user is interested in
-        for interest in user_interests:
-            if interest.weight > 1:
-                reasons.append("Matches your interests")
-                break
+        if interest_index.get(story.subreddit.lower(), 0) > 1:
+            reasons.append("Matches your interests")
         
         if not reasons:
             reasons.append("Popular story")
         
         return ", ".join(reasons)
     
-    async def get_trending_stories(self, limit: int = 10) -> List[StoryRecommendation]:
+    def get_similar_stories(self, post_id: str, limit: int = 10) -> Optional[List[StoryRecommendation]]:
+        """Stored stories most like the given one, or None when it isn't stored"""
+        post = self.story_store.get(post_id)
+        if post is None:
+            return None
+        
+        recommendations = []
+        for similar_id, similarity in self.story_embeddings.similar(post, limit * 2):
+            story = self.story_store.get(similar_id)
+            if story is not None:
+                recommendations.append(StoryRecommendation(
+                    post=story,
+                    score=similarity,
+                    reason=f"Similar to \"{post.title}\""
+                ))
+        
+        # Leading with the source story drops its reposts from the results
+        source = StoryRecommendation(post=post, score=1.0, reason="")
+        return self.story_fingerprints.collapse([source] + recommendations, limit + 1, lambda rec: rec.post)[1:]
+    
+    async def get_trending_stories(self, limit: int = 10, priority: int = INTERACTIVE) -> List[StoryRecommendation]:
         """Get trending stories across popular subreddits"""
-        trending_subreddits = [
-            'nosleep', 'tifu', 'relationship_advice', 'AmItheAsshole', 
-            'entitledparents', 'maliciouscompliance', 'pettyrevenge'
-        ]
+        trending_subreddits = self.TRENDING_SUBREDDITS
         
-        all_stories = []
         stories_per_subreddit = max(1, limit // len(trending_subreddits))
-        
-        for subreddit in trending_subreddits:
-            try:
-                stories = await self.reddit_service.get_subreddit_stories(
-                    subreddit,
-                    limit=stories_per_subreddit,
-                    sort='top'  # Use top posts for trending
-                )
-                all_stories.extend(stories)
-            except Exception as e:
-                print(f"Error getting trending stories from {subreddit}: {str(e)}")
-                continue
+        all_stories = await self._fetch_subreddit_stories(
+            trending_subreddits,
+            limit=stories_per_subreddit,
+            sort='top',  # Use top posts for trending
+            priority=priority
+        )
         
         recommendations = []
         for story in all_stories:
@@ -175,4 +358,4 @@ class RecommendationService:
             recommendations.append(recommendation)
         
         recommendations.sort(key=lambda x: x.score, reverse=True)
-        return recommendations[:limit] 
\ No newline at end of file
+        return self.story_fingerprints.collapse(recommendations, limit, lambda rec: rec.post) 
\ No newline at end of file
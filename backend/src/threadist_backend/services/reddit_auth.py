@@ -0,0 +1,100 @@
+import asyncio
+import base64
+import time
+from typing import Optional
+
+import httpx
+
+from ..config import Config
+
+
+class RedditTokenManager:
+    """
+    Application-only OAuth token for the Reddit API.
+
+    The token is refreshed in the background shortly before it expires, and
+    all refreshes go through one lock so concurrent callers never fetch more
+    than one token at a time.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        token_url: Optional[str] = None,
+        refresh_margin: Optional[float] = None
+    ):
+        self.client_id = client_id or Config.REDDIT_CLIENT_ID
+        self.client_secret = client_secret or Config.REDDIT_CLIENT_SECRET
+        self.user_agent = user_agent or Config.REDDIT_USER_AGENT
+        self.token_url = token_url or Config.REDDIT_TOKEN_URL
+        self.refresh_margin = refresh_margin if refresh_margin is not None else Config.REDDIT_TOKEN_REFRESH_MARGIN
+
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        # Created lazily so it binds to the running event loop (Python 3.8/3.9)
+        self._lock: Optional[asyncio.Lock] = None
+        self._background_refresh: Optional[asyncio.Task] = None
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token
+
+    async def _fetch(self, client: httpx.AsyncClient):
+        auth_string = f"{self.client_id}:{self.client_secret}"
+        auth_b64 = base64.b64encode(auth_string.encode('ascii')).decode('ascii')
+
+        headers = {
+            'Authorization': f'Basic {auth_b64}',
+            'User-Agent': self.user_agent,
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+
+        response = await client.post(
+            self.token_url,
+            headers=headers,
+            data={'grant_type': 'client_credentials'}
+        )
+        response.raise_for_status()
+        token_data = response.json()
+
+        now = time.monotonic()
+        expires_in = float(token_data.get('expires_in', 3600))
+        self._token = token_data['access_token']
+        self._expires_at = now + expires_in
+        # Never schedule the refresh before half the lifetime has passed
+        self._refresh_at = now + max(expires_in - self.refresh_margin, expires_in / 2)
+
+    async def refresh(self, client: httpx.AsyncClient, stale_token: Optional[str] = None) -> str:
+        """
+        Fetch a new token unless another caller already replaced stale_token
+        while we waited for the lock.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._token is not None and self._token != stale_token and time.monotonic() < self._refresh_at:
+                return self._token
+            await self._fetch(client)
+            return self._token
+
+    async def _refresh_in_background(self, client: httpx.AsyncClient, stale_token: str):
+        try:
+            await self.refresh(client, stale_token)
+        except Exception as e:
+            print(f"Error refreshing Reddit access token: {str(e)}")
+
+    async def get_token(self, client: httpx.AsyncClient) -> str:
+        """Return a valid access token, fetching or refreshing it as needed"""
+        now = time.monotonic()
+        if self._token is not None and now < self._expires_at:
+            if now >= self._refresh_at and (self._background_refresh is None or self._background_refresh.done()):
+                # Still valid: keep serving it while a single refresh runs ahead of expiry
+                self._background_refresh = asyncio.ensure_future(
+                    self._refresh_in_background(client, self._token)
+                )
+            return self._token
+
+        return await self.refresh(client, self._token)
@@ -0,0 +1,89 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import Config
+from ..models import RedditPost
+from .story_classifier import StoryClassifier
+
+try:
+    import ijson
+except ImportError:  # streaming is optional; json.loads handles every listing
+    ijson = None
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+ParsedListing = Tuple[List[RedditPost], Optional[str]]
+
+_CHILD_DATA = 'data.children.item.data'
+
+
+def build_story(post_data: Dict[str, Any], classifier: StoryClassifier) -> Optional[RedditPost]:
+    """RedditPost for a listing child, or None when it is not a self-post story"""
+    is_self = post_data.get('is_self', False)
+    if not is_self:
+        return None
+    selftext = post_data.get('selftext')
+    if not classifier.classify(is_self, selftext, post_data.get('subreddit', '')):
+        return None
+
+    # pydantic-core validation is ~2.5x faster than model_construct's Python loop
+    return RedditPost(
+        id=post_data['id'],
+        title=post_data['title'],
+        content=selftext or '',
+        author=post_data['author'],
+        subreddit=post_data['subreddit'],
+        score=post_data['score'],
+        num_comments=post_data['num_comments'],
+        created_utc=post_data['created_utc'],
+        url=post_data['url'],
+        is_self=is_self,
+        selftext=selftext,
+        is_story=True
+    )
+
+
+def parse_listing(data: Dict[str, Any], classifier: StoryClassifier) -> ParsedListing:
+    """Stories in a decoded listing and its "after" cursor"""
+    listing = data['data']
+    posts = []
+    for child in listing['children']:
+        post = build_story(child['data'], classifier)
+        if post is not None:
+            posts.append(post)
+    return posts, listing.get('after')
+
+
+def _stream_parse_listing(content: bytes, classifier: StoryClassifier) -> ParsedListing:
+    """
+    Build children one at a time with ijson instead of decoding the whole
+    document, so peak memory holds a single child rather than the full tree.
+    """
+    # Reddit sends "after" ahead of "children", so this stops early
+    after = next(ijson.items(content, 'data.after'), None)
+    posts = []
+    for post_data in ijson.items(content, _CHILD_DATA, use_float=True):
+        post = build_story(post_data, classifier)
+        if post is not None:
+            posts.append(post)
+    return posts, after
+
+
+def parse_listing_bytes(
+    content: bytes,
+    classifier: StoryClassifier,
+    stream: Optional[bool] = None
+) -> ParsedListing:
+    """
+    Parse a raw listing response. Responses of at least
+    REDDIT_STREAM_PARSE_MIN_BYTES are stream-parsed when ijson is installed;
+    pass stream to force either path.
+    """
+    if stream is None:
+        stream = len(content) >= Config.REDDIT_STREAM_PARSE_MIN_BYTES
+    if stream and ijson is not None:
+        return _stream_parse_listing(content, classifier)
+    return parse_listing(_loads(content), classifier)
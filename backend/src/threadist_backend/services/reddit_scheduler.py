@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+from typing import Mapping, Optional
+
+from ..config import Config
+
+# Request priorities: lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+class RedditRateLimiter:
+    """
+    Central token bucket for every call made to the Reddit API.
+
+    Two budgets are tracked: the server-side window reported by the
+    X-Ratelimit-Remaining/Reset headers, and a local burst bucket whose refill
+    rate is re-derived from that window so the remaining requests are spread
+    over the time left. Interactive requests are limited only by the window:
+    they may spend whatever is left of it immediately. Background work is
+    paced by the bucket and only proceeds while no interactive request is
+    waiting and more than background_reserve requests remain.
+    """
+
+    def __init__(
+        self,
+        requests_per_window: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        burst: Optional[int] = None,
+        background_reserve: Optional[int] = None
+    ):
+        self.requests_per_window = requests_per_window or Config.REDDIT_RATE_LIMIT_REQUESTS
+        self.window_seconds = window_seconds or Config.REDDIT_RATE_LIMIT_WINDOW
+        self.burst = burst or Config.REDDIT_RATE_LIMIT_BURST
+        self.background_reserve = background_reserve if background_reserve is not None else Config.REDDIT_BACKGROUND_RESERVE
+
+        now = time.monotonic()
+        self._remaining = float(self.requests_per_window)
+        self._reset_at = now + self.window_seconds
+        self._tokens = float(self.burst)
+        self._updated_at = now
+        self._blocked_until = 0.0
+        self._interactive_waiting = 0
+
+    def _rate(self, now: float) -> float:
+        return max(self._remaining, 1.0) / max(self._reset_at - now, 1.0)
+
+    def _refill(self, now: float):
+        if now >= self._reset_at:
+            # A new server window started
+            self._remaining = float(self.requests_per_window)
+            self._reset_at = now + self.window_seconds
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self._rate(now))
+        self._updated_at = now
+
+    def _wait_time(self, now: float, priority: int) -> float:
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        floor = 0 if priority == INTERACTIVE else self.background_reserve
+        if self._remaining - 1 < floor:
+            return max(self._reset_at - now, 0.05)
+        if priority == INTERACTIVE:
+            return 0.0
+        if self._interactive_waiting:
+            return 0.05
+        if self._tokens < 1:
+            return (1 - self._tokens) / self._rate(now)
+        return 0.0
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        """Wait until a request at this priority may be sent"""
+        if priority == INTERACTIVE:
+            self._interactive_waiting += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now, priority)
+                if wait <= 0:
+                    if priority != INTERACTIVE:
+                        self._tokens -= 1
+                    self._remaining -= 1
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            if priority == INTERACTIVE:
+                self._interactive_waiting -= 1
+
+    def update(self, headers: Mapping[str, str]):
+        """Adopt the server's view of the current rate-limit window"""
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining_value = float(remaining)
+            reset_value = float(reset)
+        except ValueError:
+            return
+
+        now = time.monotonic()
+        self._refill(now)
+        self._remaining = remaining_value
+        self._reset_at = now + reset_value
+        self._tokens = min(self._tokens, remaining_value)
+
+    def block_for(self, seconds: float):
+        """Hold every request for the given time (e.g. after a 429)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Retry-After when the server sent one, otherwise full-jitter exponential backoff"""
+        if retry_after:
+            try:
+                return min(float(retry_after), Config.REDDIT_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        ceiling = min(Config.REDDIT_RETRY_MAX_DELAY, Config.REDDIT_RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(Config.REDDIT_RETRY_BASE_DELAY / 2, ceiling)
@@ -1,60 +1,131 @@
+import asyncio
+import time
 import httpx
-import base64
-from typing import List, Optional
-from ..models import RedditPost, SubredditInfo
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from ..models import RedditPost, SubredditInfo, SubredditStoriesRequest, SubredditStoriesResult
 from ..config import Config
+from .reddit_auth import RedditTokenManager
+from .fanout import fan_out
+from .listing_cache import ListingCache
+from .reddit_parser import ParsedListing, parse_listing_bytes
+from .reddit_scheduler import BACKGROUND, INTERACTIVE, RedditRateLimiter
+from .story_classifier import StoryClassifier
+
+# Seconds between the end of a page walk and callers' SUBREDDIT_FETCH_TIMEOUT
+WALK_DEADLINE_MARGIN = 0.5
+# time_budget for walks with no caller timeout around them, such as ingestion
+NO_DEADLINE = float("inf")
 
 class RedditService:
-    def __init__(self):
-        self.client_id = Config.REDDIT_CLIENT_ID
-        self.client_secret = Config.REDDIT_CLIENT_SECRET
+    def __init__(
+        self,
+        token_manager: Optional[RedditTokenManager] = None,
+        rate_limiter: Optional[RedditRateLimiter] = None,
+        listing_cache: Optional[ListingCache] = None,
+        story_classifier: Optional[StoryClassifier] = None
+    ):
         self.user_agent = Config.REDDIT_USER_AGENT
-        self.access_token = None
+        self.api_base_url = Config.REDDIT_API_BASE_URL
+        # Share one token manager between instances so they refresh a single token
+        self.token_manager = token_manager or RedditTokenManager()
+        self.rate_limiter = rate_limiter or RedditRateLimiter()
+        self.listing_cache = listing_cache or ListingCache.from_config()
+        self.story_classifier = story_classifier or StoryClassifier()
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def start(self):
+        """Create the shared pooled HTTP client used for all Reddit calls"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=Config.REDDIT_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=Config.REDDIT_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.REDDIT_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=Config.REDDIT_KEEPALIVE_EXPIRY
+                ),
+                timeout=Config.REDDIT_REQUEST_TIMEOUT
+            )
+    
+    async def close(self):
+        """Close the shared HTTP client and release pooled connections"""
+        await self.listing_cache.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it lazily if startup was skipped"""
+        if self._client is None:
+            await self.start()
+        return self._client
         
-    async def _get_access_token(self) -> str:
-        """Get Reddit OAuth access token"""
-        if self.access_token:
-            return self.access_token
-            
-        auth_string = f"{self.client_id}:{self.client_secret}"
-        auth_bytes = auth_string.encode('ascii')
-        auth_b64 = base64.b64encode(auth_bytes).decode('ascii')
-        
-        headers = {
-            'Authorization': f'Basic {auth_b64}',
-            'User-Agent': self.user_agent,
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        priority: int = INTERACTIVE
+    ) -> httpx.Response:
+        """
+        Authenticated GET against the Reddit API.
         
-        data = {
-            'grant_type': 'client_credentials'
-        }
+        Every call waits for the shared rate limiter, retries once with a fresh
+        token on 401 and retries 429/5xx responses with jittered backoff.
+        """
+        client = await self._get_client()
+        token = await self.token_manager.get_token(client)
+        refreshed = False
+        attempt = 0
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                'https://www.reddit.com/api/v1/access_token',
-                headers=headers,
-                data=data
-            )
-            response.raise_for_status()
-            token_data = response.json()
-            self.access_token = token_data['access_token']
-            return self.access_token
+        while True:
+            await self.rate_limiter.acquire(priority)
+            try:
+                response = await client.get(url, headers=self._auth_headers(token), params=params)
+            except httpx.TransportError:
+                if attempt >= Config.REDDIT_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(self.rate_limiter.backoff_delay(attempt))
+                attempt += 1
+                continue
+            
+            self.rate_limiter.update(response.headers)
+            
+            if response.status_code == 401 and not refreshed:
+                token = await self.token_manager.refresh(client, stale_token=token)
+                refreshed = True
+                continue
+            
+            retryable = response.status_code == 429 or response.status_code >= 500
+            if not retryable or attempt >= Config.REDDIT_MAX_RETRIES:
+                return response
+            
+            delay = self.rate_limiter.backoff_delay(attempt, response.headers.get('retry-after'))
+            if response.status_code == 429:
+                # Back everyone off, not just this request
+                self.rate_limiter.block_for(delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
     
-    async def search_stories(self, query: str, subreddit: Optional[str] = None, limit: int = 25) -> List[RedditPost]:
-        """Search for stories on Reddit"""
-        token = await self._get_access_token()
-        
-        headers = {
+    def _auth_headers(self, token: str) -> Dict[str, str]:
+        return {
             'Authorization': f'Bearer {token}',
             'User-Agent': self.user_agent
         }
-        
+    
+    async def search_page(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 25,
+        after: Optional[str] = None,
+        priority: int = INTERACTIVE
+    ) -> ParsedListing:
+        """Fetch one page of search results: its stories and the next page's cursor"""
         # Build search URL
         if subreddit:
-            url = f"https://oauth.reddit.com/r/{subreddit}/search"
+            url = f"{self.api_base_url}/r/{subreddit}/search"
         else:
-            url = "https://oauth.reddit.com/search"
+            url = f"{self.api_base_url}/search"
         
         params = {
             'q': query,
@@ -63,103 +134,250 @@ class RedditService:
             't': 'all',
             'type': 'link'
         }
+        if after:
+            params['after'] = after
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            posts = []
-            for child in data['data']['children']:
-                post_data = child['data']
-                
-                # Only include self posts (text posts)
-                if post_data.get('is_self', False):
-                    post = RedditPost(
-                        id=post_data['id'],
-                        title=post_data['title'],
-                        content=post_data.get('selftext', ''),
-                        author=post_data['author'],
-                        subreddit=post_data['subreddit'],
-                        score=post_data['score'],
-                        num_comments=post_data['num_comments'],
-                        created_utc=post_data['created_utc'],
-                        url=post_data['url'],
-                        is_self=post_data['is_self'],
-                        selftext=post_data.get('selftext')
-                    )
-                    
-                    # Only include posts that are stories
-                    if post.is_story:
-                        posts.append(post)
-            
-            return posts
+        response = await self._get(url, params, priority)
+        response.raise_for_status()
+        return parse_listing_bytes(response.content, self.story_classifier)
+    
+    def iter_search_stories(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        want: int = 25,
+        priority: int = INTERACTIVE,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ) -> AsyncIterator[RedditPost]:
+        """Stream search results that are stories, following after cursors until want are found"""
+        return self._walk_pages(
+            lambda after: self.search_page(query, subreddit, Config.REDDIT_CRAWL_PAGE_SIZE, after, priority),
+            want,
+            max_pages,
+            time_budget
+        )
+    
+    async def search_stories(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 25,
+        priority: int = INTERACTIVE
+    ) -> List[RedditPost]:
+        """Search for stories on Reddit"""
+        return [post async for post in self.iter_search_stories(query, subreddit, limit, priority)]
     
-    async def get_subreddit_stories(self, subreddit: str, limit: int = 25, sort: str = 'hot') -> List[RedditPost]:
-        """Get stories from a specific subreddit"""
-        token = await self._get_access_token()
+    async def get_subreddit_stories(
+        self,
+        subreddit: str,
+        limit: int = 25,
+        sort: str = 'hot',
+        priority: int = INTERACTIVE
+    ) -> List[RedditPost]:
+        """Get stories from a specific subreddit, served from the listing cache when fresh"""
+        return await self.listing_cache.get_or_fetch(
+            subreddit,
+            sort,
+            limit,
+            lambda bucket: self.fetch_subreddit_stories(subreddit, bucket, sort, priority),
+            # Revalidating a stale listing never holds up a user request
+            refresh_fetch=lambda bucket: self.fetch_subreddit_stories(subreddit, bucket, sort, BACKGROUND)
+        )
+    
+    async def get_subreddit_stories_batch(
+        self,
+        requests: List[SubredditStoriesRequest]
+    ) -> List[SubredditStoriesResult]:
+        """
+        Several subreddit listings at once, fetched concurrently through
+        get_subreddit_stories. One result per request, in request order; a
+        listing that fails or misses the latency budget carries an error
+        instead of failing the batch. Repeated listings are fetched once.
+        """
+        keys = [(request.subreddit.lower(), request.sort, request.limit) for request in requests]
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'User-Agent': self.user_agent
-        }
+        async def fetch(key):
+            subreddit, sort, limit = key
+            return await self.get_subreddit_stories(subreddit, limit, sort)
         
-        url = f"https://oauth.reddit.com/r/{subreddit}/{sort}"
+        fetched = await fan_out(
+            keys,
+            fetch,
+            concurrency=Config.SUBREDDIT_BATCH_CONCURRENCY,
+            item_timeout=Config.SUBREDDIT_FETCH_TIMEOUT,
+            budget=Config.SUBREDDIT_BATCH_LATENCY_BUDGET
+        )
+        
+        results = []
+        for request, key in zip(requests, keys):
+            result = SubredditStoriesResult(subreddit=request.subreddit, sort=request.sort, limit=request.limit)
+            if key in fetched:
+                result.stories = fetched[key]
+            elif key in fetched.errors:
+                result.error = f"Error getting subreddit stories: {fetched.errors[key]}"
+            else:
+                result.error = "Timed out getting subreddit stories"
+            results.append(result)
+        return results
+    
+    async def fetch_subreddit_page(
+        self,
+        subreddit: str,
+        limit: int = 25,
+        sort: str = 'hot',
+        after: Optional[str] = None,
+        priority: int = INTERACTIVE
+    ) -> ParsedListing:
+        """Fetch one listing page directly from Reddit: its stories and the next page's cursor"""
+        url = f"{self.api_base_url}/r/{subreddit}/{sort}"
         params = {
             'limit': limit
         }
+        if after:
+            params['after'] = after
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            posts = []
-            for child in data['data']['children']:
-                post_data = child['data']
+        response = await self._get(url, params, priority)
+        response.raise_for_status()
+        return parse_listing_bytes(response.content, self.story_classifier)
+    
+    def iter_subreddit_stories(
+        self,
+        subreddit: str,
+        sort: str = 'hot',
+        want: int = 25,
+        priority: int = INTERACTIVE,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ) -> AsyncIterator[RedditPost]:
+        """Stream a subreddit's stories, following after cursors until want are found"""
+        return self._walk_pages(
+            lambda after: self.fetch_subreddit_page(subreddit, Config.REDDIT_CRAWL_PAGE_SIZE, sort, after, priority),
+            want,
+            max_pages,
+            time_budget
+        )
+    
+    async def fetch_subreddit_stories(
+        self,
+        subreddit: str,
+        limit: int = 25,
+        sort: str = 'hot',
+        priority: int = INTERACTIVE,
+        time_budget: Optional[float] = None
+    ) -> List[RedditPost]:
+        """Fetch up to limit stories from a specific subreddit directly from Reddit"""
+        return [
+            post async for post in
+            self.iter_subreddit_stories(subreddit, sort, limit, priority, time_budget=time_budget)
+        ]
+    
+    async def _walk_pages(
+        self,
+        fetch_page: Callable[[Optional[str]], Awaitable[ParsedListing]],
+        want: int,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None
+    ) -> AsyncIterator[RedditPost]:
+        """
+        Yield stories page by page until want have been yielded, the listing
+        ends, max_pages pages were fetched or time_budget seconds have passed.
+        The default budget is capped below SUBREDDIT_FETCH_TIMEOUT, so the
+        walk finishes before callers that wrap it in that timeout give up on
+        everything it collected; callers without a timeout pass NO_DEADLINE.
+        When a later page misses the deadline or fails, the stories found so
+        far are kept; only a failing first page raises.
+        
+        Only a handful of posts per page pass the story filter, so the next
+        page is requested as soon as a cursor is known and downloads while
+        the current page is consumed. Pages are full size (100) because the
+        rate limit counts requests, not posts.
+        """
+        max_pages = max_pages or Config.REDDIT_CRAWL_MAX_PAGES
+        if time_budget is None:
+            time_budget = min(
+                Config.REDDIT_CRAWL_TIME_BUDGET,
+                max(0.1, Config.SUBREDDIT_FETCH_TIMEOUT - WALK_DEADLINE_MARGIN)
+            )
+        deadline = time.monotonic() + time_budget
+        
+        pending: Optional[asyncio.Future] = asyncio.ensure_future(fetch_page(None))
+        pages = 1
+        yielded = 0
+        seen: Set[str] = set()
+        try:
+            while pending is not None and yielded < want:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    if remaining == NO_DEADLINE:
+                        posts, after = await pending
+                    else:
+                        posts, after = await asyncio.wait_for(pending, remaining)
+                except Exception as e:
+                    pending = None
+                    if pages == 1:
+                        raise
+                    # Later pages only add to what we already have
+                    if not isinstance(e, asyncio.TimeoutError):
+                        print(f"Error fetching listing page {pages}, keeping {yielded} stories: {str(e)}")
+                    break
+                pending = None
                 
-                # Only include self posts (text posts)
-                if post_data.get('is_self', False):
-                    post = RedditPost(
-                        id=post_data['id'],
-                        title=post_data['title'],
-                        content=post_data.get('selftext', ''),
-                        author=post_data['author'],
-                        subreddit=post_data['subreddit'],
-                        score=post_data['score'],
-                        num_comments=post_data['num_comments'],
-                        created_utc=post_data['created_utc'],
-                        url=post_data['url'],
-                        is_self=post_data['is_self'],
-                        selftext=post_data.get('selftext')
-                    )
-                    
-                    # Only include posts that are stories
-                    if post.is_story:
-                        posts.append(post)
-            
-            return posts
+                if after and pages < max_pages:
+                    pending = asyncio.ensure_future(fetch_page(after))
+                    pages += 1
+                
+                for post in posts:
+                    # Listings shift while we page, so a post can show up twice
+                    if post.id in seen:
+                        continue
+                    seen.add(post.id)
+                    yield post
+                    yielded += 1
+                    if yielded >= want:
+                        break
+        finally:
+            if pending is not None:
+                pending.cancel()
     
-    async def get_subreddit_info(self, subreddit: str) -> Optional[SubredditInfo]:
+    async def get_subreddit_info(self, subreddit: str, priority: int = INTERACTIVE) -> Optional[SubredditInfo]:
         """Get information about a subreddit"""
-        token = await self._get_access_token()
+        url = f"{self.api_base_url}/r/{subreddit}/about"
         
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'User-Agent': self.user_agent
+        response = await self._get(url, priority=priority)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        
+        subreddit_data = data['data']
+        return SubredditInfo(
+            name=subreddit_data['display_name'],
+            display_name=subreddit_data['display_name'],
+            description=subreddit_data.get('public_description', ''),
+            subscribers=subreddit_data['subscribers'],
+            url=subreddit_data['url'],
+            is_nsfw=subreddit_data.get('over18', False)
+        )
+    
+    async def search_subreddits(self, query: str, limit: int = 10, priority: int = INTERACTIVE) -> List[SubredditInfo]:
+        """Search for subreddits"""
+        url = f"{self.api_base_url}/subreddits/search"
+        params = {
+            'q': query,
+            'limit': limit
         }
         
-        url = f"https://oauth.reddit.com/r/{subreddit}/about"
+        response = await self._get(url, params, priority)
+        response.raise_for_status()
+        data = response.json()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            data = response.json()
-            
-            subreddit_data = data['data']
-            return SubredditInfo(
+        subreddits = []
+        for child in data['data']['children']:
+            subreddit_data = child['data']
+            subreddit = SubredditInfo(
                 name=subreddit_data['display_name'],
                 display_name=subreddit_data['display_name'],
                 description=subreddit_data.get('public_description', ''),
@@ -167,38 +385,6 @@ class RedditService:
                 url=subreddit_data['url'],
                 is_nsfw=subreddit_data.get('over18', False)
             )
-    
-    async def search_subreddits(self, query: str, limit: int = 10) -> List[SubredditInfo]:
-        """Search for subreddits"""
-        token = await self._get_access_token()
-        
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'User-Agent': self.user_agent
-        }
+            subreddits.append(subreddit)
         
-        url = "https://oauth.reddit.com/subreddits/search"
-        params = {
-            'q': query,
-            'limit': limit
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            subreddits = []
-            for child in data['data']['children']:
-                subreddit_data = child['data']
-                subreddit = SubredditInfo(
-                    name=subreddit_data['display_name'],
-                    display_name=subreddit_data['display_name'],
-                    description=subreddit_data.get('public_description', ''),
-                    subscribers=subreddit_data['subscribers'],
-                    url=subreddit_data['url'],
-                    is_nsfw=subreddit_data.get('over18', False)
-                )
-                subreddits.append(subreddit)
-            
-            return subreddits 
\ No newline at end of file
+        return subreddits 
\ No newline at end of file
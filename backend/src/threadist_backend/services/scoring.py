@@ -0,0 +1,87 @@
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..models import RedditPost
+
+# Recency boost drops by one point per hour of age, down to zero
+RECENCY_BOOST_MAX = 100.0
+# Each comment adds two points, capped
+ENGAGEMENT_PER_COMMENT = 2.0
+ENGAGEMENT_BOOST_MAX = 100.0
+
+
+class CandidateBatch:
+    """Candidate posts as columnar arrays, one row per post"""
+
+    def __init__(
+        self,
+        score: np.ndarray,
+        num_comments: np.ndarray,
+        created_utc: np.ndarray,
+        subreddit_index: np.ndarray,
+        subreddits: List[str],
+        posts: Optional[Sequence[RedditPost]] = None
+    ):
+        self.score = score
+        self.num_comments = num_comments
+        self.created_utc = created_utc
+        self.subreddit_index = subreddit_index
+        # subreddit_index values index into this list
+        self.subreddits = subreddits
+        self.posts = posts
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    @classmethod
+    def from_posts(cls, posts: Sequence[RedditPost]) -> "CandidateBatch":
+        subreddit_ids: Dict[str, int] = {}
+        subreddit_index = np.fromiter(
+            (subreddit_ids.setdefault(post.subreddit.lower(), len(subreddit_ids)) for post in posts),
+            dtype=np.int32,
+            count=len(posts)
+        )
+        return cls(
+            score=np.fromiter((post.score for post in posts), dtype=np.float64, count=len(posts)),
+            num_comments=np.fromiter((post.num_comments for post in posts), dtype=np.float64, count=len(posts)),
+            created_utc=np.fromiter((post.created_utc for post in posts), dtype=np.float64, count=len(posts)),
+            subreddit_index=subreddit_index,
+            subreddits=list(subreddit_ids),
+            posts=posts
+        )
+
+
+def score_batch(
+    batch: CandidateBatch,
+    subreddit_boosts: np.ndarray,
+    now: Optional[float] = None,
+    content_boosts: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Personalized score for every candidate in one pass: Reddit score plus
+    recency, engagement and the interest boost of the post's subreddit
+    (subreddit_boosts[i] applies to batch.subreddits[i]), plus an optional
+    per-candidate content boost.
+    """
+    now = time.time() if now is None else now
+    age_in_hours = (now - batch.created_utc) / 3600.0
+    recency_boost = np.clip(RECENCY_BOOST_MAX - age_in_hours, 0.0, None)
+    engagement_boost = np.minimum(batch.num_comments * ENGAGEMENT_PER_COMMENT, ENGAGEMENT_BOOST_MAX)
+    interest_boost = subreddit_boosts[batch.subreddit_index]
+    scores = batch.score + interest_boost + recency_boost + engagement_boost
+    if content_boosts is not None:
+        scores = scores + content_boosts
+    return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (equal scores keep input order)"""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.sort(np.argpartition(-scores, k - 1)[:k])
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
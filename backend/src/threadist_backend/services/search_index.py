@@ -0,0 +1,126 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from ..models import RedditPost
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Title words say more about a story than any one body word
+TITLE_WEIGHT = 3
+
+# Words nearly every story contains; they are neither indexed nor searched
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be because been but by can could did do does
+don't for from had has have he her him his how i i'm if in into is it it's its just me my no
+not of on or our out she so some than that the their them then there they this to too up us
+was we were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class StorySearchIndex:
+    """
+    In-process inverted index over stored stories, ranked with BM25.
+
+    Attach it to a StoryStore with attach(); every upsert or removal in the
+    store then updates the postings of just the affected stories.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {post id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self._doc_length: Dict[str, int] = {}
+        self._doc_subreddit: Dict[str, str] = {}
+        # (title, selftext) last indexed, so refreshed scores don't reindex text
+        self._doc_source: Dict[str, Tuple[str, str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_length)
+
+    def attach(self, story_store):
+        """Index everything already in the store and follow its changes"""
+        self.add(story_store.all_stories())
+        story_store.add_upsert_listener(self.add)
+        story_store.add_remove_listener(self.remove)
+
+    def add(self, posts: List[RedditPost]):
+        for post in posts:
+            source = (post.title, post.selftext or "")
+            if self._doc_source.get(post.id) == source:
+                continue
+            self.remove(post.id)
+
+            terms = Counter(tokenize(post.selftext or ""))
+            for term in tokenize(post.title):
+                terms[term] += TITLE_WEIGHT
+            length = sum(terms.values())
+
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[post.id] = frequency
+            self._doc_terms[post.id] = tuple(terms)
+            self._doc_length[post.id] = length
+            self._doc_subreddit[post.id] = post.subreddit.lower()
+            self._doc_source[post.id] = source
+            self._total_length += length
+
+    def remove(self, post_id: str):
+        terms = self._doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(post_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_length.pop(post_id)
+        self._doc_subreddit.pop(post_id, None)
+        self._doc_source.pop(post_id, None)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 25,
+        subreddit: Optional[str] = None,
+        min_match: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Best (post id, BM25 score) matches for query, optionally within one
+        subreddit. With min_match, a story must contain at least that share
+        of the query's (non-stopword) terms to count as a match.
+        """
+        documents = len(self._doc_length)
+        terms = set(tokenize(query))
+        if not documents or not terms:
+            return []
+        average_length = self._total_length / documents
+        subreddit = subreddit.lower() if subreddit else None
+        required = max(1, math.ceil(min_match * len(terms)))
+
+        scores: Dict[str, float] = {}
+        matched: Counter = Counter()
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            for post_id, frequency in postings.items():
+                if subreddit and self._doc_subreddit[post_id] != subreddit:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._doc_length[post_id] / average_length)
+                scores[post_id] = scores.get(post_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                matched[post_id] += 1
+
+        if required > 1:
+            scores = {post_id: score for post_id, score in scores.items() if matched[post_id] >= required}
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,51 @@
+from typing import List, Optional
+
+from ..config import Config
+from ..models import RedditPost
+from .reddit_service import RedditService
+from .search_index import StorySearchIndex
+from .story_store import StoryStore
+
+
+class StorySearchService:
+    """
+    Story search answered from the local index of crawled stories, falling
+    back to Reddit's search API only when too few local stories match.
+    """
+
+    def __init__(self, reddit_service: RedditService, story_store: StoryStore):
+        self.reddit_service = reddit_service
+        self.story_store = story_store
+        self.index = StorySearchIndex()
+        self.index.attach(story_store)
+
+    def search_local(self, query: str, subreddit: Optional[str] = None, limit: int = 25) -> List[RedditPost]:
+        """Stored stories containing most of the query's terms, best first"""
+        stories = []
+        matches = self.index.search(query, limit, subreddit, min_match=Config.LOCAL_SEARCH_MIN_TERM_MATCH)
+        for post_id, _ in matches:
+            post = self.story_store.get(post_id)
+            if post is not None:
+                stories.append(post)
+        return stories
+
+    async def search(self, query: str, subreddit: Optional[str] = None, limit: int = 25) -> List[RedditPost]:
+        """Search stories, locally first"""
+        stories = self.search_local(query, subreddit, limit)
+        if len(stories) >= min(limit, Config.LOCAL_SEARCH_MIN_RESULTS):
+            return stories
+
+        try:
+            remote = await self.reddit_service.search_stories(query, subreddit, limit)
+        except Exception as e:
+            if stories:
+                print(f"Error searching Reddit, serving local results: {str(e)}")
+                return stories
+            raise
+
+        # Keep what Reddit found so the next similar query is answered locally
+        self.story_store.upsert(remote)
+
+        seen = {post.id for post in stories}
+        stories.extend(post for post in remote if post.id not in seen)
+        return stories[:limit]
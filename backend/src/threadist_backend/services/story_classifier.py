@@ -0,0 +1,70 @@
+import re
+from typing import Dict, Optional, Pattern, Sequence, Union
+
+from ..models import RedditPost
+
+DEFAULT_STORY_KEYWORDS = ('story', 'tale', 'experience', 'happened', 'incident', 'event')
+DEFAULT_MIN_LENGTH = 200
+
+
+class StoryRule:
+    """
+    Decides whether a self post's text reads as a story: longer than
+    min_length and containing any keyword (substring match, case-insensitive).
+    Subclass and override matches() for rules that are not keyword based.
+    """
+
+    def __init__(
+        self,
+        keywords: Sequence[str] = DEFAULT_STORY_KEYWORDS,
+        min_length: int = DEFAULT_MIN_LENGTH
+    ):
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.min_length = min_length
+
+    def matches(self, text: str) -> bool:
+        # Short posts are rejected before the text is lowercased. str's substring
+        # search outruns an re alternation in CPython (see bench_story_classifier).
+        if len(text) <= self.min_length:
+            return False
+        lowered = text.lower()
+        return any(keyword in lowered for keyword in self.keywords)
+
+
+class PatternStoryRule(StoryRule):
+    """Story rule backed by a regular expression, for subreddit rules keywords can't express"""
+
+    def __init__(self, pattern: Union[str, Pattern], min_length: int = DEFAULT_MIN_LENGTH):
+        super().__init__((), min_length)
+        self.pattern = re.compile(pattern, re.IGNORECASE) if isinstance(pattern, str) else pattern
+
+    def matches(self, text: str) -> bool:
+        return len(text) > self.min_length and self.pattern.search(text) is not None
+
+
+class StoryClassifier:
+    """Story detection run once per post at parse time, with optional per-subreddit rules"""
+
+    def __init__(
+        self,
+        default_rule: Optional[StoryRule] = None,
+        subreddit_rules: Optional[Dict[str, StoryRule]] = None
+    ):
+        self.default_rule = default_rule or StoryRule()
+        self._subreddit_rules: Dict[str, StoryRule] = {}
+        for subreddit, rule in (subreddit_rules or {}).items():
+            self.register(subreddit, rule)
+
+    def register(self, subreddit: str, rule: StoryRule):
+        self._subreddit_rules[subreddit.lower()] = rule
+
+    def rule_for(self, subreddit: str) -> StoryRule:
+        return self._subreddit_rules.get(subreddit.lower(), self.default_rule)
+
+    def classify(self, is_self: bool, selftext: Optional[str], subreddit: str = "") -> bool:
+        if not is_self or not selftext:
+            return False
+        return self.rule_for(subreddit).matches(selftext)
+
+    def classify_post(self, post: RedditPost) -> bool:
+        return self.classify(post.is_self, post.selftext, post.subreddit)
@@ -0,0 +1,126 @@
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config import Config
+from ..models import RedditPost
+
+
+class StoryStore:
+    """
+    In-process store of crawled stories.
+
+    Stories are deduplicated by post id. For every (subreddit, sort) listing
+    the store keeps the post order of the latest crawl, so request handlers
+    can serve "hot"/"new"/"top" without calling Reddit. A listing older than
+    listing_max_age is dropped, so callers fall back to a live fetch when
+    ingestion stops refreshing it.
+    """
+
+    def __init__(self, max_stories: Optional[int] = None, listing_max_age: Optional[float] = None):
+        self.max_stories = max_stories or Config.STORY_STORE_MAX_STORIES
+        self.listing_max_age = listing_max_age or Config.STORY_LISTING_MAX_AGE
+        self._stories: Dict[str, RedditPost] = {}
+        self._seen_at: Dict[str, float] = {}
+        # (subreddit lowercased, sort) -> post ids in listing order
+        self._listings: Dict[Tuple[str, str], List[str]] = {}
+        self._listing_updated_at: Dict[Tuple[str, str], float] = {}
+        self._by_subreddit: Dict[str, Set[str]] = {}
+        # Secondary indexes kept in step with the store
+        self._upsert_listeners: List[Callable[[List[RedditPost]], None]] = []
+        self._remove_listeners: List[Callable[[str], None]] = []
+
+    def add_upsert_listener(self, listener: Callable[[List[RedditPost]], None]):
+        """Call listener with every batch of stored (new or refreshed) stories"""
+        self._upsert_listeners.append(listener)
+
+    def add_remove_listener(self, listener: Callable[[str], None]):
+        """Call listener with the id of every story dropped from the store"""
+        self._remove_listeners.append(listener)
+
+    def __len__(self) -> int:
+        return len(self._stories)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self._stories
+
+    def get(self, post_id: str) -> Optional[RedditPost]:
+        return self._stories.get(post_id)
+
+    def upsert(self, posts: Iterable[RedditPost]) -> List[RedditPost]:
+        """Insert or refresh stories; returns the ones not seen before"""
+        now = time.time()
+        added = []
+        stored = []
+        for post in posts:
+            if post.id not in self._stories:
+                added.append(post)
+            self._stories[post.id] = post
+            self._seen_at[post.id] = now
+            self._by_subreddit.setdefault(post.subreddit.lower(), set()).add(post.id)
+            stored.append(post)
+        for listener in self._upsert_listeners:
+            listener(stored)
+        self._evict()
+        return added
+
+    def upsert_listing(self, subreddit: str, sort: str, posts: List[RedditPost]) -> List[RedditPost]:
+        """Store a crawled listing, replacing the previous order for it"""
+        key = (subreddit.lower(), sort)
+        self._listings[key] = [post.id for post in posts]
+        self._listing_updated_at[key] = time.time()
+        return self.upsert(posts)
+
+    def has_listing(self, subreddit: str, sort: str) -> bool:
+        """Whether a crawl of the listing exists and is recent enough to serve"""
+        key = (subreddit.lower(), sort)
+        updated_at = self._listing_updated_at.get(key)
+        if updated_at is None:
+            return False
+        if time.time() - updated_at > self.listing_max_age:
+            # Also stops eviction from protecting the stale listing's stories
+            del self._listings[key]
+            del self._listing_updated_at[key]
+            return False
+        return True
+
+    def get_listing(self, subreddit: str, sort: str, limit: int) -> List[RedditPost]:
+        """Stories from the latest crawl of a listing, in Reddit's order"""
+        ids = self._listings.get((subreddit.lower(), sort), [])
+        stories = []
+        for post_id in ids:
+            post = self._stories.get(post_id)
+            if post is not None:
+                stories.append(post)
+                if len(stories) >= limit:
+                    break
+        return stories
+
+    def stories_for_subreddit(self, subreddit: str) -> List[RedditPost]:
+        ids = self._by_subreddit.get(subreddit.lower(), ())
+        return [self._stories[post_id] for post_id in ids if post_id in self._stories]
+
+    def all_stories(self) -> List[RedditPost]:
+        return list(self._stories.values())
+
+    def _evict(self):
+        overflow = len(self._stories) - self.max_stories
+        if overflow <= 0:
+            return
+
+        # Never drop stories that are part of a current listing
+        listed = {post_id for ids in self._listings.values() for post_id in ids}
+        candidates = sorted(
+            (seen_at, post_id) for post_id, seen_at in self._seen_at.items() if post_id not in listed
+        )
+        for _, post_id in candidates[:overflow]:
+            self.remove(post_id)
+
+    def remove(self, post_id: str):
+        post = self._stories.pop(post_id, None)
+        self._seen_at.pop(post_id, None)
+        if post is not None:
+            ids = self._by_subreddit.get(post.subreddit.lower())
+            if ids is not None:
+                ids.discard(post_id)
+            for listener in self._remove_listeners:
+                listener(post_id)
@@ -0,0 +1,134 @@
+import bisect
+import heapq
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from ..config import Config
+from ..models import SubredditInfo
+from .reddit_service import RedditService
+from .singleflight import SingleFlight
+
+
+def normalize_name(name: str) -> str:
+    """Lowercased subreddit name without a leading r/ or /r/"""
+    name = name.strip().lower()
+    for prefix in ("/r/", "r/"):
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+class SubredditNameIndex:
+    """Sorted list of known subreddit names for prefix (autocomplete) lookups"""
+
+    def __init__(self, max_names: Optional[int] = None):
+        self.max_names = max_names or Config.SUBREDDIT_INDEX_MAX_NAMES
+        self._names: List[str] = []
+        self._info: Dict[str, SubredditInfo] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, info: SubredditInfo):
+        name = normalize_name(info.name)
+        if name not in self._info:
+            if len(self._names) >= self.max_names:
+                return
+            bisect.insort(self._names, name)
+        self._info[name] = info
+
+    def prefix(self, prefix: str, limit: int) -> List[SubredditInfo]:
+        """Up to limit known subreddits whose name starts with prefix, most subscribers first"""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self._names, prefix)
+        hi = bisect.bisect_left(self._names, prefix + "\uffff", lo)
+        matches = (self._info[name] for name in self._names[lo:hi])
+        return heapq.nlargest(limit, matches, key=lambda info: info.subscribers)
+
+
+class SubredditDirectory:
+    """
+    Subreddit metadata served from memory. About pages are cached for
+    SUBREDDIT_INFO_TTL seconds and 404s for SUBREDDIT_NOT_FOUND_TTL;
+    identical concurrent lookups share one Reddit call. Every subreddit seen
+    joins a name index, so search (autocomplete) is answered locally when
+    enough known names match.
+    """
+
+    def __init__(self, reddit_service: RedditService, max_entries: Optional[int] = None):
+        self.reddit_service = reddit_service
+        self.max_entries = max_entries or Config.SUBREDDIT_CACHE_MAX_ENTRIES
+        self.index = SubredditNameIndex()
+        # key -> (expires_at, value); None values are cached 404s
+        self._info: "OrderedDict[str, Tuple[float, Optional[SubredditInfo]]]" = OrderedDict()
+        self._searches: "OrderedDict[Tuple[str, int], Tuple[float, List[SubredditInfo]]]" = OrderedDict()
+        self._flights = SingleFlight()
+
+    def _cached(self, cache: OrderedDict, key: Hashable):
+        """(True, value) for a live entry, else (False, None)"""
+        entry = cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del cache[key]
+            return False, None
+        cache.move_to_end(key)
+        return True, value
+
+    def _store(self, cache: OrderedDict, key: Hashable, value, ttl: float):
+        cache[key] = (time.monotonic() + ttl, value)
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def _remember(self, info: SubredditInfo):
+        self.index.add(info)
+        self._store(self._info, normalize_name(info.name), info, Config.SUBREDDIT_INFO_TTL)
+
+    async def get_info(self, subreddit: str) -> Optional[SubredditInfo]:
+        """Subreddit metadata, or None when Reddit has no such subreddit"""
+        name = normalize_name(subreddit)
+        hit, info = self._cached(self._info, name)
+        if hit:
+            return info
+        return await self._flights.do(("info", name), lambda: self._fetch_info(name))
+
+    async def _fetch_info(self, name: str) -> Optional[SubredditInfo]:
+        info = await self.reddit_service.get_subreddit_info(name)
+        if info is None:
+            self._store(self._info, name, None, Config.SUBREDDIT_NOT_FOUND_TTL)
+        else:
+            self._remember(info)
+        return info
+
+    async def search(self, query: str, limit: int = 10) -> List[SubredditInfo]:
+        """Search subreddits, from known names first"""
+        subreddits = self.index.prefix(query, limit)
+        if len(subreddits) >= min(limit, Config.SUBREDDIT_LOCAL_SEARCH_MIN_RESULTS):
+            return subreddits
+
+        key = (query.strip().lower(), limit)
+        hit, remote = self._cached(self._searches, key)
+        if not hit:
+            try:
+                remote = await self._flights.do(("search",) + key, lambda: self._fetch_search(*key))
+            except Exception as e:
+                if subreddits:
+                    print(f"Error searching subreddits on Reddit, serving known names: {str(e)}")
+                    return subreddits
+                raise
+
+        seen = {normalize_name(info.name) for info in subreddits}
+        subreddits.extend(info for info in remote if normalize_name(info.name) not in seen)
+        return subreddits[:limit]
+
+    async def _fetch_search(self, query: str, limit: int) -> List[SubredditInfo]:
+        remote = await self.reddit_service.search_subreddits(query, limit)
+        for info in remote:
+            self._remember(info)
+        self._store(self._searches, (query, limit), remote, Config.SUBREDDIT_SEARCH_TTL)
+        return remote
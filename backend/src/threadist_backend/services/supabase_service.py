@@ -1,21 +1,50 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from ..config import Config
 from ..models import UserInterest, CategorySubreddit, InterestCategory, UserProfile
 
 class SupabaseService:
-    def __init__(self):
-        self.supabase: Client = create_client(
+    def __init__(self, client: Optional[Client] = None):
+        self.supabase: Client = client or create_client(
             Config.SUPABASE_URL,
             Config.SUPABASE_SERVICE_ROLE_KEY
         )
+        # The supabase client is synchronous, so every call runs on a dedicated
+        # bounded pool instead of blocking the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.SUPABASE_EXECUTOR_WORKERS,
+            thread_name_prefix="supabase"
+        )
+        # In-process cache of the small category_subreddits table, keyed by csid
+        self._category_subreddit_cache: Dict[str, CategorySubreddit] = {}
+        self._category_subreddit_cache_loaded_at: Optional[float] = None
+        # Called with a user_id whenever that user's interests change
+        self._interest_change_listeners: List[Callable[[str], None]] = []
+    
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking supabase call on the executor and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def _execute(self, query):
+        """Execute a postgrest query builder off the event loop"""
+        return await self._run(query.execute)
+    
+    def close(self):
+        """Shut down the executor used for blocking supabase calls"""
+        self._executor.shutdown(wait=False)
     
-    async def get_user_interests(self, user_id: str) -> List[UserInterest]:
-        """Get user interests from database"""
+    async def get_user_interests(self, user_id: str, raise_errors: bool = False) -> List[UserInterest]:
+        """Get user interests from database (an empty list on errors unless raise_errors)"""
         try:
-            response = self.supabase.table('user_interests').select(
+            query = self.supabase.table('user_interests').select(
                 'interest_id, csid, user_id, weight'
-            ).eq('user_id', user_id).execute()
+            ).eq('user_id', user_id)
+            response = await self._execute(query)
             
             interests = []
             for row in response.data:
@@ -29,18 +58,24 @@ class SupabaseService:
             
             return interests
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error getting user interests: {str(e)}")
             return []
     
-    async def get_category_subreddits(self, category_id: Optional[str] = None) -> List[CategorySubreddit]:
-        """Get category subreddits from database"""
+    async def get_category_subreddits(
+        self,
+        category_id: Optional[str] = None,
+        raise_errors: bool = False
+    ) -> List[CategorySubreddit]:
+        """Get category subreddits from database (an empty list on errors unless raise_errors)"""
         try:
             query = self.supabase.table('category_subreddits').select('csid, category_id, subreddit')
             
             if category_id:
                 query = query.eq('category_id', category_id)
             
-            response = query.execute()
+            response = await self._execute(query)
             
             subreddits = []
             for row in response.data:
@@ -53,15 +88,88 @@ class SupabaseService:
             
             return subreddits
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error getting category subreddits: {str(e)}")
             return []
     
+    def invalidate_category_subreddit_cache(self):
+        """Drop the cached category_subreddits rows so the next lookup reloads them"""
+        self._category_subreddit_cache = {}
+        self._category_subreddit_cache_loaded_at = None
+    
+    def add_interest_change_listener(self, listener: Callable[[str], None]):
+        """Register a callback run with the user_id after their interests change"""
+        self._interest_change_listeners.append(listener)
+    
+    def _interests_changed(self, user_id: str):
+        self.invalidate_category_subreddit_cache()
+        for listener in self._interest_change_listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                print(f"Error notifying interest change listener: {str(e)}")
+    
+    def _category_subreddit_cache_expired(self) -> bool:
+        loaded_at = self._category_subreddit_cache_loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > Config.CATEGORY_SUBREDDIT_CACHE_TTL
+    
+    async def resolve_interest_subreddits(
+        self,
+        interests: List[UserInterest],
+        raise_errors: bool = False
+    ) -> Dict[str, CategorySubreddit]:
+        """Map each interest csid to its category subreddit using the cached table (empty on errors unless raise_errors)"""
+        try:
+            if self._category_subreddit_cache_expired():
+                # The table is small, so load it whole in a single query
+                try:
+                    rows = await self.get_category_subreddits(raise_errors=True)
+                except Exception as e:
+                    # Never mark a failed load as loaded; serve the previous
+                    # table, if any, and retry on the next lookup
+                    if self._category_subreddit_cache_loaded_at is None:
+                        raise
+                    print(f"Error reloading category subreddits, keeping the cached table: {str(e)}")
+                else:
+                    self._category_subreddit_cache = {row.csid: row for row in rows}
+                    self._category_subreddit_cache_loaded_at = time.monotonic()
+            
+            csids = list(dict.fromkeys(interest.csid for interest in interests))
+            missing = [csid for csid in csids if csid not in self._category_subreddit_cache]
+            
+            if missing:
+                # Rows added since the last load: fetch them all with one in_ filter
+                query = self.supabase.table('category_subreddits').select(
+                    'csid, category_id, subreddit'
+                ).in_('csid', missing)
+                response = await self._execute(query)
+                
+                for row in response.data:
+                    self._category_subreddit_cache[row['csid']] = CategorySubreddit(
+                        csid=row['csid'],
+                        category_id=row['category_id'],
+                        subreddit=row['subreddit']
+                    )
+            
+            return {
+                csid: self._category_subreddit_cache[csid]
+                for csid in csids
+                if csid in self._category_subreddit_cache
+            }
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Error resolving interest subreddits: {str(e)}")
+            return {}
+    
     async def get_interest_categories(self) -> List[InterestCategory]:
         """Get all interest categories from database"""
         try:
-            response = self.supabase.table('interest_categories').select(
+            query = self.supabase.table('interest_categories').select(
                 'category_id, slug, label, emoji, description'
-            ).execute()
+            )
+            response = await self._execute(query)
             
             categories = []
             for row in response.data:
@@ -82,12 +190,14 @@ class SupabaseService:
     async def add_user_interest(self, user_id: str, csid: str, weight: int = 1) -> bool:
         """Add a user interest to database"""
         try:
-            response = self.supabase.table('user_interests').insert({
+            query = self.supabase.table('user_interests').insert({
                 'user_id': user_id,
                 'csid': csid,
                 'weight': weight
-            }).execute()
+            })
+            response = await self._execute(query)
             
+            self._interests_changed(user_id)
             return len(response.data) > 0
         except Exception as e:
             print(f"Error adding user interest: {str(e)}")
@@ -96,10 +206,12 @@ class SupabaseService:
     async def remove_user_interest(self, user_id: str, csid: str) -> bool:
         """Remove a user interest from database"""
         try:
-            response = self.supabase.table('user_interests').delete().eq(
+            query = self.supabase.table('user_interests').delete().eq(
                 'user_id', user_id
-            ).eq('csid', csid).execute()
+            ).eq('csid', csid)
+            response = await self._execute(query)
             
+            self._interests_changed(user_id)
             return len(response.data) > 0
         except Exception as e:
             print(f"Error removing user interest: {str(e)}")
@@ -108,10 +220,12 @@ class SupabaseService:
     async def update_user_interest_weight(self, user_id: str, csid: str, weight: int) -> bool:
         """Update user interest weight"""
         try:
-            response = self.supabase.table('user_interests').update({
+            query = self.supabase.table('user_interests').update({
                 'weight': weight
-            }).eq('user_id', user_id).eq('csid', csid).execute()
+            }).eq('user_id', user_id).eq('csid', csid)
+            response = await self._execute(query)
             
+            self._interests_changed(user_id)
             return len(response.data) > 0
         except Exception as e:
             print(f"Error updating user interest weight: {str(e)}")
@@ -120,10 +234,13 @@ class SupabaseService:
     async def get_user_profile(self, user_id: str) -> Optional[UserProfile]:
         """Get user profile from auth.users table"""
         try:
-            response = self.supabase.auth.admin.get_user_by_id(user_id)
+            # Both lookups run on the executor, so issue them together
+            response, interests = await asyncio.gather(
+                self._run(self.supabase.auth.admin.get_user_by_id, user_id),
+                self.get_user_interests(user_id)
+            )
             
             if response.user:
-                interests = await self.get_user_interests(user_id)
                 return UserProfile(
                     user_id=user_id,
                     email=response.user.email,
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import Config
+from ..models import StoryRecommendation
+from .recommendation_service import RecommendationService
+from .reddit_scheduler import BACKGROUND, INTERACTIVE
+from .singleflight import SingleFlight
+
+# Largest limit /api/recommendations/trending accepts
+MAX_TRENDING_LIMIT = 50
+
+
+class TrendingSnapshot:
+    """One materialized trending feed, rendered to JSON once per limit"""
+
+    def __init__(self, recommendations: List[StoryRecommendation]):
+        self.generated_at = time.time()
+        self.recommendations = recommendations
+        self._items = [rec.model_dump_json().encode("utf-8") for rec in recommendations]
+        self._rendered: Dict[int, Tuple[bytes, str]] = {}
+
+    def render(self, limit: int) -> Tuple[bytes, str]:
+        """Serialized JSON array of the first limit stories and its ETag"""
+        rendered = self._rendered.get(limit)
+        if rendered is None:
+            body = b"[" + b",".join(self._items[:limit]) + b"]"
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            rendered = (body, etag)
+            self._rendered[limit] = rendered
+        return rendered
+
+
+class TrendingFeed:
+    """
+    Trending stories are the same for every user, so they are computed on a
+    schedule and swapped in atomically; requests only read the snapshot.
+    """
+
+    def __init__(self, recommendation_service: RecommendationService):
+        self.recommendation_service = recommendation_service
+        self._snapshot: Optional[TrendingSnapshot] = None
+        self._flights = SingleFlight()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[TrendingSnapshot]:
+        return self._snapshot
+
+    async def _rebuild(self, priority: int) -> TrendingSnapshot:
+        recommendations = await self.recommendation_service.get_trending_stories(MAX_TRENDING_LIMIT, priority)
+        snapshot = TrendingSnapshot(recommendations)
+        # Pre-render the app's default page size so the first read is a lookup
+        snapshot.render(10)
+        self._snapshot = snapshot
+        return snapshot
+
+    async def refresh(self, priority: int = BACKGROUND) -> TrendingSnapshot:
+        """Recompute the feed; concurrent callers share one rebuild"""
+        return await self._flights.do("trending", lambda: self._rebuild(priority))
+
+    async def get(self, limit: int) -> Tuple[bytes, str]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Only the first request before the schedule has run waits on a build
+            snapshot = await self.refresh(INTERACTIVE)
+        return snapshot.render(limit)
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing trending feed: {str(e)}")
+            await asyncio.sleep(Config.TRENDING_REFRESH_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
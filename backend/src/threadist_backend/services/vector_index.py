@@ -0,0 +1,183 @@
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..config import Config
+
+KMEANS_ITERATIONS = 8
+# Training samples per inverted list
+KMEANS_SAMPLES_PER_LIST = 32
+# Rows scored per matrix multiply when assigning rows to lists
+ASSIGN_BLOCK_ROWS = 16384
+
+
+class VectorIndex:
+    """
+    Inner-product nearest-neighbour index over unit float32 vectors.
+
+    Small indexes are searched exhaustively with one matrix-vector product.
+    Past ANN_BRUTE_FORCE_MAX rows the index trains an inverted file (IVF):
+    k-means partitions the vectors into ~sqrt(n) lists and a query only
+    scores the ANN_NPROBE lists whose centroids are closest. New vectors join
+    their nearest list immediately; the lists are retrained once the index
+    has doubled since the last training.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        brute_force_max: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        capacity: int = 1024
+    ):
+        self.dim = dim
+        self.brute_force_max = brute_force_max if brute_force_max is not None else Config.ANN_BRUTE_FORCE_MAX
+        self.nprobe = nprobe or Config.ANN_NPROBE
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._live = np.zeros(capacity, dtype=bool)
+        # row -> key, None once removed
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._trained_rows = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        return None if row is None else self._vectors[row]
+
+    def _reserve(self, rows: int):
+        capacity = max(1, len(self._vectors))
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self._keys)] = self._vectors[:len(self._keys)]
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._keys)] = self._live[:len(self._keys)]
+        self._vectors, self._live = vectors, live
+
+    def add(self, key: str, vector: np.ndarray):
+        self.add_many([key], vector[None, :])
+
+    def add_many(self, keys: List[str], vectors: np.ndarray):
+        """Insert unit vectors (one row per key); an existing key is replaced"""
+        for key in keys:
+            self.remove(key)
+        start = len(self._keys)
+        self._reserve(start + len(keys))
+        self._vectors[start:start + len(keys)] = vectors
+        self._live[start:start + len(keys)] = True
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+        self._keys.extend(keys)
+
+        if len(self._rows) > self.brute_force_max and len(self._rows) >= 2 * self._trained_rows:
+            self._train()
+        elif self._centroids is not None:
+            self._assign(np.arange(start, start + len(keys)))
+
+    def remove(self, key: str):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        self._keys[row] = None
+        self._live[row] = False
+        if len(self._keys) - len(self._rows) >= max(1024, len(self._keys) // 2):
+            self._compact()
+
+    def _compact(self):
+        """Drop removed rows and renumber the rest"""
+        live = np.flatnonzero(self._live[:len(self._keys)])
+        self._keys = [self._keys[row] for row in live.tolist()]
+        self._vectors = self._vectors[live].copy()
+        self._live = np.ones(len(live), dtype=bool)
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._reserve(max(1024, len(live)))
+        if self._centroids is not None:
+            self._lists = [[] for _ in range(len(self._centroids))]
+            self._assign(np.arange(len(live)))
+
+    def _assign(self, rows: np.ndarray):
+        for block in range(0, len(rows), ASSIGN_BLOCK_ROWS):
+            chunk = rows[block:block + ASSIGN_BLOCK_ROWS]
+            nearest = np.argmax(self._vectors[chunk] @ self._centroids.T, axis=1)
+            for row, centroid in zip(chunk.tolist(), nearest.tolist()):
+                self._lists[centroid].append(row)
+
+    def _train(self):
+        """Spherical k-means over a sample of the live vectors, then rebuild the lists"""
+        live = np.flatnonzero(self._live[:len(self._keys)])
+        nlist = max(1, int(math.sqrt(len(live))))
+        rng = np.random.default_rng(len(live))
+        sample = self._vectors[rng.choice(live, size=min(len(live), nlist * KMEANS_SAMPLES_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Lists that lost every sample keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids).astype(np.float32)
+
+        self._centroids = centroids
+        self._lists = [[] for _ in range(nlist)]
+        self._assign(live)
+        self._trained_rows = len(live)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        exclude: Optional[Set[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Up to k (key, inner product) pairs, best first"""
+        if not self._rows or k <= 0:
+            return []
+        query = query.astype(np.float32, copy=False)
+
+        if self._centroids is None:
+            # A contiguous slice avoids copying the matrix; removed rows just lose
+            count = len(self._keys)
+            rows = np.arange(count)
+            scores = self._vectors[:count] @ query
+            scores[~self._live[:count]] = -np.inf
+        else:
+            nprobe = min(self.nprobe, len(self._centroids))
+            probed = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.fromiter(
+                (row for centroid in probed.tolist() for row in self._lists[centroid]),
+                dtype=np.int64
+            )
+            rows = rows[self._live[rows]]
+            scores = self._vectors[rows] @ query
+
+        # Excluded keys can take slots in the top k, so over-select a little
+        take = min(len(rows), k + len(exclude or ()))
+        if take <= 0:
+            return []
+        best = np.argpartition(-scores, take - 1)[:take]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        results = []
+        for i in best.tolist():
+            key = self._keys[rows[i]]
+            if key is None or (exclude and key in exclude):
+                continue
+            results.append((key, float(scores[i])))
+            if len(results) >= k:
+                break
+        return results
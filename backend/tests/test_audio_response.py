@@ -0,0 +1,117 @@
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from threadist_backend.audio_response import IMMUTABLE_CACHE_CONTROL, audio_file_response
+
+AUDIO = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    (tmp_path / "clip.mp3").write_bytes(AUDIO)
+    (tmp_path / "empty.mp3").write_bytes(b"")
+    return tmp_path
+
+
+@pytest.fixture
+def client(audio_dir):
+    app = FastAPI()
+
+    @app.get("/audio/{filename}")
+    async def get_audio(filename: str, request: Request):
+        return await audio_file_response(request, os.path.join(audio_dir, filename), filename)
+
+    return TestClient(app)
+
+
+def etag_of(client, filename="clip.mp3"):
+    return client.get(f"/audio/{filename}").headers["etag"]
+
+
+def test_full_file(client):
+    response = client.get("/audio/clip.mp3")
+    assert response.status_code == 200
+    assert response.content == AUDIO
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["etag"].startswith('"clip-')
+
+
+def test_etag_is_stable(client):
+    assert etag_of(client) == etag_of(client)
+
+
+def test_etag_survives_touch(client, audio_dir):
+    before = etag_of(client)
+    os.utime(audio_dir / "clip.mp3", ns=(1, 1))
+    assert etag_of(client) == before
+
+
+def test_etag_changes_when_file_is_rewritten(client, audio_dir):
+    before = etag_of(client)
+    (audio_dir / "clip.mp3").write_bytes(AUDIO[:100])
+    assert etag_of(client) != before
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=1000-", 1000, 1023),
+    ("bytes=-24", 1000, 1023),
+    ("bytes=1000-5000", 1000, 1023),
+])
+def test_range(client, header, start, end):
+    response = client.get("/audio/clip.mp3", headers={"Range": header})
+    assert response.status_code == 206
+    assert response.content == AUDIO[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(AUDIO)}"
+    assert response.headers["content-length"] == str(end - start + 1)
+
+
+def test_not_modified(client):
+    etag = etag_of(client)
+    response = client.get("/audio/clip.mp3", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_modified_when_etag_differs(client):
+    response = client.get("/audio/clip.mp3", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.content == AUDIO
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=2000-3000", "bytes=-0", "bytes=50-10"])
+def test_range_not_satisfiable(client, header):
+    response = client.get("/audio/clip.mp3", headers={"Range": header})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(AUDIO)}"
+
+
+@pytest.mark.parametrize("header", ["bytes=-10", "bytes=0-", "bytes=0-0"])
+def test_range_of_empty_file_not_satisfiable(client, header):
+    response = client.get("/audio/empty.mp3", headers={"Range": header})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
+
+
+def test_if_range_match_serves_range(client):
+    response = client.get("/audio/clip.mp3", headers={"Range": "bytes=0-9", "If-Range": etag_of(client)})
+    assert response.status_code == 206
+    assert response.content == AUDIO[:10]
+
+
+def test_if_range_mismatch_serves_full_file(client):
+    response = client.get("/audio/clip.mp3", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == AUDIO
+
+
+@pytest.mark.parametrize("header", ["bytes=0-9,20-29", "items=0-9", "bytes=abc"])
+def test_unsupported_range_serves_full_file(client, header):
+    response = client.get("/audio/clip.mp3", headers={"Range": header})
+    assert response.status_code == 200
+    assert response.content == AUDIO
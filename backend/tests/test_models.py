@@ -0,0 +1,23 @@
+import pytest
+from pydantic import ValidationError
+
+from threadist_backend.models import SubredditStoriesRequest
+
+
+@pytest.mark.parametrize("subreddit", ["nosleep", "AmItheAsshole", "tifu", "ai", "a_b_c_1"])
+def test_subreddit_stories_request_accepts_subreddit_names(subreddit):
+    assert SubredditStoriesRequest(subreddit=subreddit).subreddit == subreddit
+
+
+@pytest.mark.parametrize("subreddit", [
+    "",
+    "a",
+    "x" * 22,
+    "nosleep/../../api/v1/me",
+    "nosleep?limit=1",
+    "no sleep",
+    "../me",
+])
+def test_subreddit_stories_request_rejects_other_paths(subreddit):
+    with pytest.raises(ValidationError):
+        SubredditStoriesRequest(subreddit=subreddit)
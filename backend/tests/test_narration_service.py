@@ -0,0 +1,94 @@
+import asyncio
+import gc
+
+import pytest
+
+from threadist_backend.config import Config
+from threadist_backend.services.narration_service import NarrationService
+
+PIECES = [f"Sentence number {index} of the story." for index in range(8)]
+
+
+class FakeNarration(NarrationService):
+    """NarrationService whose stream synthesizes each piece after a short delay"""
+
+    def __init__(self, fail_on=None):
+        self.active = 0
+        self.peak = 0
+        self.started = []
+        self.fail_on = fail_on
+
+    async def stream(self, text, voice_id=None, model_id=None, output_format=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.started.append(text)
+        try:
+            await asyncio.sleep(0.01)
+            if text == self.fail_on:
+                raise RuntimeError(f"synthesis failed for {text!r}")
+            yield text.encode()
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def one_piece_per_chunk(monkeypatch):
+    # Every sentence becomes its own chunk
+    monkeypatch.setattr(Config, "TTS_CHUNK_MAX_CHARS", len(PIECES[0]) + 2)
+    monkeypatch.setattr(Config, "TTS_LONGFORM_WORKERS", 2)
+
+
+async def collect(service, limit=None, pause=0.0):
+    """Read up to limit pieces, then wait pause seconds before closing the stream"""
+    out = []
+    stream = service.stream_long(" ".join(PIECES))
+    try:
+        async for audio in stream:
+            out.append(audio)
+            if limit is not None and len(out) >= limit:
+                await asyncio.sleep(pause)
+                break
+    finally:
+        await stream.aclose()
+    return out
+
+
+def test_pieces_arrive_in_order():
+    service = FakeNarration()
+    assert asyncio.run(collect(service)) == [piece.encode() for piece in PIECES]
+
+
+def test_live_piece_counts_against_workers():
+    service = FakeNarration()
+    asyncio.run(collect(service))
+    assert service.peak <= Config.TTS_LONGFORM_WORKERS
+
+
+def test_only_a_window_is_synthesized_ahead():
+    service = FakeNarration()
+    asyncio.run(collect(service, limit=2, pause=0.1))
+    # Two pieces read plus a full window behind them, however long the reader stalls
+    assert len(service.started) <= 2 + Config.TTS_LONGFORM_WORKERS
+    assert service.active == 0
+
+
+def test_closing_the_stream_settles_pieces_in_flight():
+    errors = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        service = FakeNarration(fail_on=PIECES[2])
+        await collect(service, limit=1, pause=0.1)
+        # Nothing is left running once the stream is closed
+        assert service.active == 0
+        gc.collect()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert errors == []
+
+
+def test_failing_piece_raises():
+    service = FakeNarration(fail_on=PIECES[3])
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect(service))
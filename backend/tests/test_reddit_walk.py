@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+import pytest
+
+from threadist_backend.models import RedditPost
+from threadist_backend.services.reddit_service import NO_DEADLINE, RedditService
+
+
+def story(index):
+    return RedditPost(
+        id=f"p{index}",
+        title=f"Story {index}",
+        content="",
+        author="author",
+        subreddit="nosleep",
+        score=1,
+        num_comments=0,
+        created_utc=0.0,
+        url="",
+        is_self=True,
+        is_story=True,
+    )
+
+
+def page(start, count=10, after="next"):
+    return [story(index) for index in range(start, start + count)], after
+
+
+def service_with_pages(*pages):
+    """A RedditService whose listing pages come from pages, in order; callables are awaited"""
+    service = RedditService()
+    calls = []
+
+    async def fetch_subreddit_page(subreddit, limit=25, sort="hot", after=None, priority=None):
+        result = pages[len(calls)]
+        calls.append(after)
+        if callable(result):
+            return await result()
+        return result
+
+    service.fetch_subreddit_page = fetch_subreddit_page
+    service.calls = calls
+    return service
+
+
+async def forbidden():
+    request = httpx.Request("GET", "https://oauth.reddit.com/r/nosleep/hot")
+    raise httpx.HTTPStatusError("403 Forbidden", request=request, response=httpx.Response(403, request=request))
+
+
+async def stalled():
+    await asyncio.sleep(60)
+
+
+def test_walks_after_cursors_until_limit():
+    service = service_with_pages(page(0), page(10), page(20))
+    posts = asyncio.run(service.fetch_subreddit_stories("nosleep", limit=25))
+    assert [post.id for post in posts] == [f"p{index}" for index in range(25)]
+    assert service.calls == [None, "next", "next"]
+
+
+def test_later_page_error_keeps_partial_listing():
+    service = service_with_pages(page(0), forbidden)
+    posts = asyncio.run(service.get_subreddit_stories("nosleep", limit=25))
+    assert [post.id for post in posts] == [f"p{index}" for index in range(10)]
+
+
+def test_first_page_error_raises():
+    service = service_with_pages(forbidden)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(service.fetch_subreddit_stories("nosleep", limit=25))
+
+
+def test_later_page_timeout_keeps_partial_listing():
+    service = service_with_pages(page(0), stalled)
+    posts = asyncio.run(service.fetch_subreddit_stories("nosleep", limit=25, time_budget=0.2))
+    assert len(posts) == 10
+
+
+def test_first_page_timeout_raises():
+    service = service_with_pages(stalled)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service.fetch_subreddit_stories("nosleep", limit=25, time_budget=0.2))
+
+
+def test_no_deadline_waits_for_slow_pages():
+    async def slow():
+        await asyncio.sleep(0.3)
+        return page(10, after=None)
+
+    service = service_with_pages(page(0), slow)
+    posts = asyncio.run(service.fetch_subreddit_stories("nosleep", limit=25, time_budget=NO_DEADLINE))
+    assert len(posts) == 20